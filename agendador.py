@@ -0,0 +1,86 @@
+import threading
+import time
+
+
+class AgendadorCaptura:
+    """
+    Controla o ritmo do loop de captura.
+
+    - Enquanto a área de legenda está "viva" (mudou há pouco), faz polling rápido
+      (intervalo_min), para que uma legenda nova comece o OCR quase imediatamente.
+    - Quando a tela fica parada por muito tempo, o intervalo cresce aos poucos
+      até intervalo_max (backoff), economizando CPU.
+    - Pausa e parada não fazem polling: a thread fica bloqueada até alguém chamar acordar().
+    - O ritmo do OCR é separado do ritmo de polling: ocr_liberado() garante um espaçamento
+      mínimo entre duas execuções de OCR, sem atrasar a detecção de mudança.
+    """
+
+    def __init__(self, stop_event: threading.Event, pause_event: threading.Event,
+                 intervalo_min: float = 0.1, intervalo_max: float = 1.0,
+                 ocioso_apos: float = 5.0, fator_backoff: float = 1.5,
+                 intervalo_ocr: float = 0.3):
+        self.stop_event = stop_event
+        self.pause_event = pause_event  # quando setado => pausado
+
+        self.intervalo_min = intervalo_min
+        self.intervalo_max = intervalo_max
+        self.ocioso_apos = ocioso_apos
+        self.fator_backoff = fator_backoff
+        self.intervalo_ocr = intervalo_ocr
+
+        self._acordar = threading.Event()
+        self._intervalo = intervalo_min
+        self._ultima_mudanca = time.monotonic()
+        self._ultimo_ocr = 0.0
+
+    def acordar(self) -> None:
+        """
+        Interrompe a espera atual (retomar, ler novamente, sair, nova área...).
+        Pode ser chamado de qualquer thread.
+        """
+        self._acordar.set()
+
+    def registrar_mudanca(self) -> None:
+        """
+        A área mudou: volta ao polling rápido.
+        """
+        self._ultima_mudanca = time.monotonic()
+        self._intervalo = self.intervalo_min
+
+    def registrar_ocr(self) -> None:
+        self._ultimo_ocr = time.monotonic()
+        self.registrar_mudanca()
+
+    def ocr_liberado(self) -> bool:
+        """
+        True se já passou o espaçamento mínimo desde o último OCR.
+        """
+        return time.monotonic() - self._ultimo_ocr >= self.intervalo_ocr
+
+    def _proximo_intervalo(self) -> float:
+        ocioso = time.monotonic() - self._ultima_mudanca
+        if ocioso < self.ocioso_apos:
+            return self.intervalo_min
+
+        self._intervalo = min(self.intervalo_max, self._intervalo * self.fator_backoff)
+        return self._intervalo
+
+    def aguardar(self) -> bool:
+        """
+        Espera até o próximo tick de captura.
+        Bloqueia sem polling enquanto estiver pausado.
+        Retorna False quando o loop deve encerrar.
+        """
+        while self.pause_event.is_set() and not self.stop_event.is_set():
+            self._acordar.wait()
+            self._acordar.clear()
+
+        if self.stop_event.is_set():
+            return False
+
+        if self._acordar.wait(self._proximo_intervalo()):
+            # acordado antes do tempo (ex.: ler novamente): próximo ciclo é rápido
+            self._acordar.clear()
+            self.registrar_mudanca()
+
+        return not self.stop_event.is_set()
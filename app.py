@@ -1,9 +1,48 @@
 import tkinter as tk
 from tkinter import ttk
 import re
+import threading
 
 from opencv import CONFIG
-from dictionary import buscar_significado_pt
+from metricas import METRICAS
+from dictionary import ConsultaSignificado
+
+
+class CanalUI:
+    """
+    Canal de resultados worker -> Tk. Qualquer thread pode publicar; só o último valor importa.
+    O Tk só é acordado quando há algo novo, e várias publicações dentro do mesmo frame
+    viram uma única repintura.
+    """
+
+    def __init__(self, app, entregar, frame_ms: int = 16):
+        self.app = app
+        self.entregar = entregar  # chamado no main thread do Tk com o último valor
+        self.frame_ms = frame_ms
+
+        self._lock = threading.Lock()
+        self._ultimo = None
+        self._agendado = False
+
+    def publicar(self, *valor) -> None:
+        with self._lock:
+            self._ultimo = valor
+            if self._agendado:
+                return  # já existe entrega marcada: ela levará o valor mais novo
+            self._agendado = True
+
+        try:
+            self.app.after(self.frame_ms, self._entregar)
+        except (RuntimeError, tk.TclError):
+            pass  # app encerrado
+
+    def _entregar(self) -> None:
+        with self._lock:
+            valor = self._ultimo
+            self._agendado = False
+
+        if valor is not None:
+            self.entregar(*valor)
 
 
 class App(tk.Tk):
@@ -25,15 +64,91 @@ class App(tk.Tk):
         self.main = Main(self)
         self.menu = Menu(self)
 
+        # resultados vindos das threads de OCR/tradução
+        self.canal_textos = CanalUI(self, self.update_texts)
+
+        # F3: liga/desliga o HUD de métricas
+        self.hud = HudMetricas(self)
+        self.bind("<F3>", lambda e: self.hud.alternar())
+
     def update_texts(self, texto_en: str, texto_pt: str):
-        self.main.update_texts(texto_en, texto_pt)
+        with METRICAS.medir("render_tk"):
+            self.main.update_texts(texto_en, texto_pt)
+
+    def publicar_textos(self, texto_en: str, texto_pt: str):
+        """
+        Versão thread-safe de update_texts: pode ser chamada de qualquer thread.
+        """
+        self.canal_textos.publicar(texto_en, texto_pt)
+
+    @property
+    def preview_visivel(self) -> bool:
+        """
+        Lido pela thread de pré-processamento para decidir se vale gerar a prévia.
+        """
+        return self.main.preview_visivel
 
-    def update_preview(self, png_bytes: bytes):
-        self.main.update_preview(png_bytes)
+    def update_preview(self, ppm_bytes: bytes):
+        self.main.update_preview(ppm_bytes)
 
     def registrar_callback_edicao(self, callback):
         self.on_texto_en_editado = callback
 
+class HudMetricas:
+    """
+    Overlay com as latências por estágio (METRICAS). Ligar o HUD liga a coleta;
+    desligar volta ao estado anterior.
+    """
+
+    def __init__(self, parent, intervalo_ms: int = 1000):
+        self.parent = parent
+        self.intervalo_ms = intervalo_ms
+
+        self._label = None
+        self._after_id = None
+        self._estava_ativo = METRICAS.ativo
+
+    def alternar(self):
+        if self._label is None:
+            self.mostrar()
+        else:
+            self.esconder()
+
+    def mostrar(self):
+        self._estava_ativo = METRICAS.ativo
+        METRICAS.ativar(True)
+
+        self._label = tk.Label(
+            self.parent,
+            text="",
+            justify="left",
+            anchor="nw",
+            bg="#000",
+            fg="#7CFC00",
+            font=("Consolas", 9)
+        )
+        self._label.place(relx=1.0, x=-10, y=10, anchor="ne")
+        self._atualizar()
+
+    def esconder(self):
+        if self._after_id is not None:
+            self.parent.after_cancel(self._after_id)
+            self._after_id = None
+
+        if self._label is not None:
+            self._label.destroy()
+            self._label = None
+
+        METRICAS.ativar(self._estava_ativo)
+
+    def _atualizar(self):
+        if self._label is None:
+            return
+
+        self._label.config(text=METRICAS.texto_hud())
+        self._after_id = self.parent.after(self.intervalo_ms, self._atualizar)
+
+
 class Menu(ttk.Frame):
     def __init__(self, parent):
         super().__init__(parent)
@@ -47,7 +162,7 @@ class Menu(ttk.Frame):
         row_buttons = ttk.Frame(self)
         row_buttons.pack(side="top", fill="x", pady=(5, 2))
 
-        row_buttons.columnconfigure((0, 1, 2, 3), weight=1, uniform="btn")
+        row_buttons.columnconfigure((0, 1, 2, 3, 4, 5), weight=1, uniform="btn")
 
         ttk.Button(
             row_buttons, text="Recapturar área", command=self.parent.recapturar_area
@@ -65,6 +180,29 @@ class Menu(ttk.Frame):
             row_buttons, text="Sair", command=self.parent.sair
         ).grid(row=0, column=3, padx=5, sticky="ew")
 
+        self.var_escala_auto = tk.BooleanVar(value=bool(int(CONFIG.get().resize_auto)))
+        check_escala = ttk.Checkbutton(
+            row_buttons, text="Escala automática", variable=self.var_escala_auto,
+            command=lambda: CONFIG.update(resize_auto=int(self.var_escala_auto.get()))
+        )
+        check_escala.grid(row=0, column=4, padx=5)
+
+        Tooltip(check_escala,
+                "Escolhe a escala do OCR pela altura medida das letras.\n"
+                "Desligado = usa sempre o valor do Resize.")
+
+        self.var_mascara_texto = tk.BooleanVar(value=bool(int(CONFIG.get().diff_mascara_texto)))
+        check_mascara = ttk.Checkbutton(
+            row_buttons, text="Máscara de texto", variable=self.var_mascara_texto,
+            command=lambda: CONFIG.update(diff_mascara_texto=int(self.var_mascara_texto.get()))
+        )
+        check_mascara.grid(row=0, column=5, padx=5)
+
+        Tooltip(check_mascara,
+                "Detecta mudança só nos pixels com cara de legenda\n"
+                "(letra clara com contorno escuro): o vídeo ao fundo não dispara OCR.\n"
+                "Desligue para legendas coloridas ou sem contorno.")
+
         # ===== Linha 2: Sliders =====
         row_sliders = ttk.Frame(self)
         row_sliders.pack(side="top", fill="x", pady=(2, 5), padx=10)
@@ -115,7 +253,8 @@ class Menu(ttk.Frame):
 
         add_slider(0, "Resize", 1.0, 4.0, 4.0, "resize_fx",
                    "Aumenta a escala da imagem antes do OCR.\n"
-                   "Maior = melhor para letras pequenas, mas mais lento.")
+                   "Maior = melhor para letras pequenas, mas mais lento.\n"
+                   "No modo automático, é o limite máximo da escala.")
 
         add_slider(1, "CLAHE", 0.5, 4.0, 2.0, "clahe_clip",
                    "Aumenta contraste local (CLAHE).\n"
@@ -125,8 +264,9 @@ class Menu(ttk.Frame):
                    "Controla nitidez (sharpen).\n"
                    "Excesso pode gerar ruído.")
 
-        add_slider(3, "Diff", 0.1, 6.0, 2.0, "diff_threshold",
-                   "Sensibilidade de mudança entre frames.\n"
+        add_slider(3, "Diff", 0.1, 6.0, 0.5, "diff_threshold",
+                   "Sensibilidade de mudança entre frames\n"
+                   "(% da miniatura que precisa mudar).\n"
                    "Menor = atualiza mais vezes.")
 
         add_slider(4, "text_th", 0.3, 0.9, 0.61, "text_threshold",
@@ -148,6 +288,9 @@ class Main(ttk.Frame):
 
         self._tk_preview_img = None
 
+        # só gera prévia enquanto o painel está na tela (janela não minimizada)
+        self.preview_visivel = False
+
         self.texto_en_atual = ""
         self._editando_en = False
 
@@ -159,6 +302,11 @@ class Main(ttk.Frame):
         )
         self.label_preview.pack(expand=False, fill="both", padx=10, pady=(10, 5))
 
+        self.label_preview.bind("<Map>", lambda e: self._set_preview_visivel(True))
+        self.label_preview.bind("<Unmap>", lambda e: self._set_preview_visivel(False))
+        self.parent.bind("<Map>", self._on_janela_map, add="+")
+        self.parent.bind("<Unmap>", self._on_janela_map, add="+")
+
         # texto em inglês (OCR)
         self.label_en = tk.Label(
             self,
@@ -243,6 +391,9 @@ class Main(ttk.Frame):
         # deixa somente leitura (mas vamos habilitar temporariamente quando atualizar)
         self.text_pt.config(state="disabled")
 
+        self._texto_pt_renderizado = None
+        self._configurar_tag_palavras()
+
     def _entrar_modo_edicao(self, _event=None):
         if self._editando_en:
             return
@@ -293,18 +444,32 @@ class Main(ttk.Frame):
             self.parent.on_texto_en_editado(novo_texto)
 
     def update_texts(self, texto_en, texto_pt):
-        if not self._editando_en:
+        if not self._editando_en and texto_en != self.texto_en_atual:
             self.texto_en_atual = texto_en
             self.label_en.config(text=texto_en)
 
         self.update_translation_clickable(texto_pt)
 
-    def update_preview(self, png_bytes: bytes):
-        if not png_bytes:
+    def _set_preview_visivel(self, visivel: bool):
+        self.preview_visivel = visivel
+
+    def _on_janela_map(self, event):
+        # o bind no Tk raiz também recebe eventos dos filhos: só interessa a própria janela
+        if event.widget is not self.parent:
             return
 
-        self._tk_preview_img = tk.PhotoImage(data=png_bytes)
-        self.label_preview.config(image=self._tk_preview_img, text="")
+        self.preview_visivel = (str(event.type) == "Map") and bool(self.label_preview.winfo_ismapped())
+
+    def update_preview(self, ppm_bytes: bytes):
+        if not ppm_bytes:
+            return
+
+        # reaproveita o mesmo PhotoImage: só troca os pixels
+        if self._tk_preview_img is None:
+            self._tk_preview_img = tk.PhotoImage(data=ppm_bytes, format="PPM")
+            self.label_preview.config(image=self._tk_preview_img, text="")
+        else:
+            self._tk_preview_img.configure(data=ppm_bytes, format="PPM")
 
     def _abrir_janela_significado(self, palavra: str):
         palavra = (palavra or "").strip()
@@ -382,62 +547,97 @@ class Main(ttk.Frame):
         txt.insert("1.0", "Consultando dicionário...")
         txt.config(state="disabled")
 
-        def carregar():
-            significado = buscar_significado_pt(palavra)
+        def mostrar(significado):
+            if not win.winfo_exists():
+                return
             txt.config(state="normal")
             txt.delete("1.0", "end")
             txt.insert("1.0", significado)
             txt.config(state="disabled")
 
-        win.after(50, carregar)
+        def ao_terminar(significado):
+            # roda na thread do worker: devolve para o main thread do Tk
+            try:
+                win.after(0, mostrar, significado)
+            except (RuntimeError, tk.TclError):
+                pass  # popup (ou app) já fechado
+
+        # consulta fora do main thread: vários popups podem carregar em paralelo
+        consulta = ConsultaSignificado(palavra)
+        consulta.ao_terminar(ao_terminar)
 
-        ttk.Button(frame, text="Fechar", command=win.destroy).pack(anchor="e")
+        def fechar():
+            consulta.cancelar()
+            win.destroy()
+
+        win.protocol("WM_DELETE_WINDOW", fechar)
+
+        ttk.Button(frame, text="Fechar", command=fechar).pack(anchor="e")
 
     def update_translation_clickable(self, texto_pt: str):
         """
         Renderiza o texto traduzido com palavras clicáveis.
+        Não faz nada se o texto não mudou. Todas as palavras usam uma única tag ("palavra"),
+        configurada uma vez no __init__; a palavra clicada é descoberta pelo índice do clique.
         """
+        if texto_pt == self._texto_pt_renderizado:
+            return
+        self._texto_pt_renderizado = texto_pt
+
         self.text_pt.config(state="normal")
         self.text_pt.delete("1.0", "end")
 
         if not texto_pt:
-            self.text_pt.insert("1.0", "")
             self.text_pt.config(state="disabled")
             return
 
         # separa em tokens mantendo pontuação
         tokens = re.findall(r"\w+|[^\w\s]", texto_pt, re.UNICODE)
 
+        # monta todos os pedaços e insere numa única chamada ao Tk
+        pedacos = []
         for i, token in enumerate(tokens):
             if re.fullmatch(r"\w+", token, re.UNICODE):
-                tag = f"w_{i}_{token}"
-
-                self.text_pt.insert("end", token, (tag,))
-                self.text_pt.tag_config(tag, underline=False)
-
-                # cursor de link
-                self.text_pt.tag_bind(tag, "<Enter>", lambda e: self.text_pt.config(cursor="hand2"))
-                self.text_pt.tag_bind(tag, "<Leave>", lambda e: self.text_pt.config(cursor=""))
-
-                # clique -> abre significado
-                self.text_pt.tag_bind(
-                    tag,
-                    "<Button-1>",
-                    lambda e, palavra=token: self._abrir_janela_significado(palavra)
-                )
+                pedacos.extend((token, ("palavra",)))
             else:
-                self.text_pt.insert("end", token)
+                pedacos.extend((token, ()))
 
             # adiciona espaço entre palavras (mas não antes de pontuação)
             if i < len(tokens) - 1:
                 nxt = tokens[i + 1]
-                if re.fullmatch(r"[.,;:!?)]", nxt):
-                    pass
-                else:
-                    self.text_pt.insert("end", " ")
+                if not re.fullmatch(r"[.,;:!?)]", nxt):
+                    pedacos.extend((" ", ()))
 
+        self.text_pt.insert("end", *pedacos)
         self.text_pt.config(state="disabled")
 
+    def _configurar_tag_palavras(self):
+        """
+        Tag única para todas as palavras clicáveis (criada uma vez, nunca recriada).
+        """
+        self.text_pt.tag_config("palavra", underline=False)
+
+        # cursor de link
+        self.text_pt.tag_bind("palavra", "<Enter>", lambda e: self.text_pt.config(cursor="hand2"))
+        self.text_pt.tag_bind("palavra", "<Leave>", lambda e: self.text_pt.config(cursor=""))
+
+        # clique -> abre significado
+        self.text_pt.tag_bind("palavra", "<Button-1>", self._on_clique_palavra)
+
+    def _on_clique_palavra(self, event):
+        indice = self.text_pt.index(f"@{event.x},{event.y}")
+
+        # intervalo da tag "palavra" que contém o caractere clicado
+        intervalo = self.text_pt.tag_prevrange("palavra", f"{indice}+1c")
+        if not intervalo:
+            return
+
+        inicio, fim = intervalo
+        if not (self.text_pt.compare(inicio, "<=", indice) and self.text_pt.compare(indice, "<", fim)):
+            return
+
+        self._abrir_janela_significado(self.text_pt.get(inicio, fim))
+
     def _cancelar_edicao(self, _event=None):
         self.edit_frame.place_forget()
         self._editando_en = False
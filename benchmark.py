@@ -0,0 +1,234 @@
+"""
+Benchmark headless do pipeline de legendas (sem Tk e sem captura de tela).
+
+Reproduz uma gravação (vídeo ou pasta de frames) pelo mesmo caminho do app:
+detecção de mudança (assinatura_imagem/imagem_mudou) -> preprocessar_imagem ->
+LeitorOcr.extrair_texto -> ServicoTraducao, com o TradutorLocal simulando a latência da API.
+
+Mede frames/s, chamadas de OCR por minuto de mídia, OCRs evitados, latência ponta a ponta
+(p50/p95/p99) e o pico de memória (RSS). Com --baseline, compara com um resultado gravado
+e sai com código 1 se alguma métrica piorar além da tolerância.
+
+Uso:
+    python benchmark.py gravacao.mp4 --area 0,600,1280,120 --salvar-baseline bench.json
+    python benchmark.py frames/ --fps 10 --baseline bench.json --tolerancia 0.15
+"""
+import argparse
+import json
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+
+from cache_ocr import CacheOcr
+from cache_traducao import CacheTraducao, mesma_legenda
+from metricas import METRICAS
+from ocr import LeitorOcr
+from opencv import CONFIG, EscalaAutomatica, assinatura_imagem, imagem_mudou, ler_area, ler_frames_gravados, pegada_texto, preprocessar_imagem
+from traducao import ServicoTraducao
+from tradutores import TradutorLocal
+
+# métrica -> sentido bom ("maior" ou "menor"); só estas entram na comparação com a baseline
+METRICAS_COMPARADAS = {
+    "frames_por_s": "maior",
+    "ocr_por_minuto": "menor",
+    "ocr_evitados_pct": "maior",
+    "latencia_p50_ms": "menor",
+    "latencia_p95_ms": "menor",
+    "latencia_p99_ms": "menor",
+    "rss_pico_mb": "menor",
+}
+
+
+def rss_pico_mb() -> float:
+    # ru_maxrss vem em KiB no Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def executar(origem: str, fps: float = 10.0, area=None, intervalo_ocr: float = 0.3,
+             latencia_traducao: float = 0.2,
+             latencia_por_char: float = 0.0, max_frames: int = None, leitor: LeitorOcr = None) -> dict:
+    """
+    Roda a gravação inteira em sequência e retorna o dicionário de métricas.
+    O tempo do OCR e da tradução conta em tempo real; a regra de espaçamento entre OCRs
+    (OCR_INTERVAL_MIN do app) usa o tempo da mídia, para o resultado não depender da máquina.
+    """
+    cfg = CONFIG.get()
+    leitor = leitor or LeitorOcr(cache=CacheOcr())  # carrega o modelo fora da medição
+    escala_auto = EscalaAutomatica()
+
+    pasta = tempfile.mkdtemp(prefix="bench_")
+    cache_traducoes = CacheTraducao(os.path.join(pasta, "traducoes.db"))
+    tradutor = TradutorLocal(latencia=latencia_traducao, latencia_por_char=latencia_por_char)
+    servico = ServicoTraducao(tradutor, cache_traducoes)
+
+    # contadores do leitor podem vir de uma execução anterior (leitor reaproveitado)
+    hits_inicio, reconhecimentos_inicio, deteccoes_inicio = leitor.cache.hits, leitor.reconhecimentos, leitor.deteccoes
+
+    METRICAS.amostras = 1_000_000
+    METRICAS.ativar()
+    METRICAS.zerar()
+
+    frames = sem_mudanca = adiados = legendas = 0
+    assinatura_anterior = None
+    ultimo_ocr = None
+    ultima_legenda = ""
+    t_midia = 0.0
+
+    inicio = time.perf_counter()
+    for t_midia, frame in ler_frames_gravados(origem, fps, area):
+        if max_frames and frames >= max_frames:
+            break
+        frames += 1
+        t_frame = time.perf_counter()
+
+        with METRICAS.medir("mudanca"):
+            assinatura = assinatura_imagem(frame, usar_mascara_texto=bool(int(cfg.diff_mascara_texto)))
+            mudou = assinatura_anterior is None or imagem_mudou(assinatura, assinatura_anterior, cfg.diff_threshold)
+
+        if not mudou:
+            sem_mudanca += 1
+            continue
+
+        if ultimo_ocr is not None and t_midia - ultimo_ocr < intervalo_ocr:
+            adiados += 1
+            continue
+
+        assinatura_anterior = assinatura
+        ultimo_ocr = t_midia
+
+        with METRICAS.medir("preprocessamento"):
+            escala = escala_auto.obter(frame, cfg) if int(cfg.resize_auto) == 1 else None
+            img_proc = preprocessar_imagem(frame, cfg, escala)
+            pegada = pegada_texto(frame)
+
+        with METRICAS.medir("ocr"):
+            texto = leitor.extrair_texto(img_proc, cfg, pegada=pegada)
+
+        if texto:
+            texto = texto.replace("|", "I")
+            if int(cfg.resize_auto) == 1:
+                escala_auto.confirmar()
+
+        if texto and not mesma_legenda(texto, ultima_legenda):
+            ultima_legenda = texto
+            legendas += 1
+            with METRICAS.medir("traducao"):
+                servico.traduzir(texto)
+            METRICAS.registrar("ponta_a_ponta", time.perf_counter() - t_frame)
+
+    duracao = time.perf_counter() - inicio
+    cache_traducoes.fechar()
+    shutil.rmtree(pasta, ignore_errors=True)
+
+    resumo = METRICAS.resumo()
+    METRICAS.ativar(False)
+
+    chamadas_ocr = leitor.reconhecimentos - reconhecimentos_inicio
+    # frames iguais ao anterior, adiados pelo espaçamento mínimo e resolvidos pelo cache de OCR
+    evitados = sem_mudanca + adiados + (leitor.cache.hits - hits_inicio)
+    duracao_midia = t_midia + 1.0 / fps if frames else 0.0
+    ponta = resumo["estagios"].get("ponta_a_ponta", {})
+
+    return {
+        "origem": os.path.basename(os.path.normpath(origem)),
+        "frames": frames,
+        "duracao_midia_s": round(duracao_midia, 3),
+        "duracao_s": round(duracao, 3),
+        "frames_por_s": round(frames / duracao, 3) if duracao > 0 else 0.0,
+        "ocr_chamadas": chamadas_ocr,
+        "ocr_deteccoes": leitor.deteccoes - deteccoes_inicio,
+        "ocr_por_minuto": round(chamadas_ocr / (duracao_midia / 60), 3) if duracao_midia > 0 else 0.0,
+        "ocr_evitados": evitados,
+        "ocr_evitados_pct": round(100 * evitados / frames, 3) if frames else 0.0,
+        "legendas": legendas,
+        "traducao_requisicoes": servico.requisicoes,
+        "latencia_p50_ms": round(ponta.get("p50_ms", 0.0), 3),
+        "latencia_p95_ms": round(ponta.get("p95_ms", 0.0), 3),
+        "latencia_p99_ms": round(ponta.get("p99_ms", 0.0), 3),
+        "rss_pico_mb": round(rss_pico_mb(), 1),
+        "estagios": {
+            nome: {k: round(v, 3) for k, v in e.items() if k != "por_segundo"}
+            for nome, e in resumo["estagios"].items()
+        },
+    }
+
+
+def comparar(atual: dict, baseline: dict, tolerancia: float) -> list[str]:
+    """
+    Retorna a lista de regressões (vazia se nenhuma métrica piorou além da tolerância relativa).
+    """
+    regressoes = []
+    for nome, sentido in METRICAS_COMPARADAS.items():
+        if nome not in baseline or nome not in atual:
+            continue
+
+        base, valor = float(baseline[nome]), float(atual[nome])
+        margem = abs(base) * tolerancia
+
+        piorou = valor < base - margem if sentido == "maior" else valor > base + margem
+        if piorou:
+            regressoes.append(f"{nome}: {valor:g} (baseline {base:g}, tolerância {tolerancia:.0%})")
+
+    return regressoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark headless do pipeline OCR -> tradução.")
+    parser.add_argument("origem", help="arquivo de vídeo ou pasta com os frames (png/jpg) em ordem")
+    parser.add_argument("--fps", type=float, default=10.0, help="frames por segundo amostrados (pasta: fps da gravação)")
+    parser.add_argument("--area", type=ler_area, default=None, help="recorte da legenda: x,y,largura,altura")
+    parser.add_argument("--max-frames", type=int, default=None)
+    parser.add_argument("--intervalo-ocr", type=float, default=0.3, help="espaçamento mínimo entre OCRs (s de mídia)")
+    parser.add_argument("--latencia-traducao", type=float, default=0.2, help="latência simulada por requisição (s)")
+    parser.add_argument("--latencia-por-char", type=float, default=0.0)
+    parser.add_argument("--baseline", help="JSON de referência; sai com código 1 se houver regressão")
+    parser.add_argument("--tolerancia", type=float, default=0.10, help="piora relativa aceita (0.10 = 10%%)")
+    parser.add_argument("--salvar-baseline", help="grava o resultado desta execução como baseline")
+    parser.add_argument("--json", action="store_true", help="imprime o resultado completo em JSON")
+    args = parser.parse_args()
+
+    resultado = executar(
+        args.origem,
+        fps=args.fps,
+        area=args.area,
+        intervalo_ocr=args.intervalo_ocr,
+        latencia_traducao=args.latencia_traducao,
+        latencia_por_char=args.latencia_por_char,
+        max_frames=args.max_frames,
+    )
+
+    if args.json:
+        print(json.dumps(resultado, ensure_ascii=False, indent=2))
+    else:
+        for nome, valor in resultado.items():
+            if nome != "estagios":
+                print(f"{nome:<22}{valor}")
+        print()
+        print(f"{'estágio':<18}{'n':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+        for nome, e in sorted(resultado["estagios"].items()):
+            print(f"{nome:<18}{e['n']:>7}{e['p50_ms']:>10.1f}{e['p95_ms']:>10.1f}{e['p99_ms']:>10.1f}")
+
+    if args.salvar_baseline:
+        with open(args.salvar_baseline, "w", encoding="utf-8") as f:
+            json.dump(resultado, f, ensure_ascii=False, indent=2)
+        print(f"\nBaseline gravada em {args.salvar_baseline}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+        regressoes = comparar(resultado, baseline, args.tolerancia)
+        if regressoes:
+            print("\nRegressões em relação à baseline:")
+            for r in regressoes:
+                print(" -", r)
+            sys.exit(1)
+
+        print("\nSem regressões em relação à baseline.")
+
+
+if __name__ == "__main__":
+    main()
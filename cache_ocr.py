@@ -0,0 +1,110 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+# campos do OcrConfig que mudam o resultado do EasyOCR sem mudar os pixels de img_proc
+CAMPOS_OCR = ("text_threshold", "low_text", "link_threshold")
+
+
+class CacheOcr:
+    """
+    Cache LRU de resultados de OCR, endereçado pelo conteúdo da imagem pré-processada.
+    Quando a mesma legenda volta (corte de cena, rewind, abertura repetida...), devolve
+    texto e confiança sem chamar o EasyOCR.
+
+    Memória limitada por número de entradas e pelo total de caracteres guardados.
+    Opcionalmente persiste em um arquivo JSON (carregado na criação, gravado em salvar()).
+    """
+
+    def __init__(self, max_itens: int = 2048, max_chars: int = 512_000, arquivo: str = None):
+        self.max_itens = max_itens
+        self.max_chars = max_chars
+        self.arquivo = arquivo
+
+        self._itens: OrderedDict[str, tuple[str, float]] = OrderedDict()
+        self._chars = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+        if arquivo:
+            self.carregar()
+
+    @staticmethod
+    def chave(img_proc, cfg, conf_min: float) -> str:
+        """
+        Hash do conteúdo de img_proc + formato + parâmetros que afetam o OCR.
+        """
+        h = hashlib.blake2b(digest_size=16)
+        h.update(repr(img_proc.shape).encode())
+        h.update(repr(tuple(float(getattr(cfg, c)) for c in CAMPOS_OCR) + (float(conf_min),)).encode())
+        h.update(img_proc if img_proc.flags["C_CONTIGUOUS"] else img_proc.tobytes())
+        return h.hexdigest()
+
+    def get(self, chave: str):
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is None:
+                self.misses += 1
+                return None
+
+            self._itens.move_to_end(chave)
+            self.hits += 1
+            return item
+
+    def put(self, chave: str, texto: str, conf: float) -> None:
+        with self._lock:
+            antigo = self._itens.pop(chave, None)
+            if antigo is not None:
+                self._chars -= len(antigo[0])
+
+            self._itens[chave] = (texto, float(conf))
+            self._chars += len(texto)
+
+            while self._itens and (len(self._itens) > self.max_itens or self._chars > self.max_chars):
+                _, (t, _) = self._itens.popitem(last=False)
+                self._chars -= len(t)
+
+    def estatisticas(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "itens": len(self._itens),
+                "hits": self.hits,
+                "misses": self.misses,
+                "taxa_acerto": (self.hits / total) if total else 0.0,
+            }
+
+    # ---------- Persistência ----------
+
+    def carregar(self) -> None:
+        if not self.arquivo or not os.path.exists(self.arquivo):
+            return
+
+        try:
+            with open(self.arquivo, "r", encoding="utf-8") as f:
+                dados = json.load(f)
+        except Exception as e:
+            print("Erro ao carregar cache de OCR:", e)
+            return
+
+        for chave, (texto, conf) in dados.items():
+            self.put(chave, texto, conf)
+
+    def salvar(self) -> None:
+        if not self.arquivo:
+            return
+
+        with self._lock:
+            dados = {k: list(v) for k, v in self._itens.items()}
+
+        try:
+            tmp = self.arquivo + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(dados, f, ensure_ascii=False)
+            os.replace(tmp, self.arquivo)
+        except Exception as e:
+            print("Erro ao salvar cache de OCR:", e)
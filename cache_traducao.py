@@ -0,0 +1,371 @@
+import atexit
+import os
+import queue
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+def normalizar_texto(texto: str) -> str:
+    """
+    Normaliza o texto de origem para servir de chave (espaços colapsados, sem bordas).
+    """
+    return " ".join((texto or "").split())
+
+
+# confusões típicas do OCR que não mudam o sentido: I/l/|/1, O/0 e variações de aspas
+_CONFUSOES_OCR = str.maketrans({"l": "i", "|": "i", "1": "i", "0": "o", "’": "'", "‘": "'", "`": "'", "“": '"', "”": '"'})
+# ruído que também não conta como diferença: espaços e vírgulas
+_RUIDO_OCR = re.compile(r"[\s,]+")
+
+
+def chave_aproximada(texto: str) -> str:
+    """
+    Forma "achatada" da legenda: minúsculas, confusões de OCR unificadas, sem espaços e vírgulas.
+    Qualquer outra diferença (letra ou palavra trocada, ? ! . diferentes) muda a chave:
+    "He is here." x "She is here." e "Yes?" x "Yes." continuam sendo legendas diferentes.
+    """
+    return _RUIDO_OCR.sub("", (texto or "").casefold().translate(_CONFUSOES_OCR))
+
+
+def mesma_legenda(a: str, b: str) -> bool:
+    """
+    True se as duas leituras diferem só por ruído de OCR (mesma chave_aproximada).
+    """
+    chave = chave_aproximada(a)
+    return bool(chave) and chave == chave_aproximada(b)
+
+
+class CacheTraducao:
+    """
+    Cache persistente de traduções (SQLite em modo WAL), chaveado por idioma de origem,
+    idioma de destino e texto normalizado.
+
+    - Camada em memória (LRU pequena) na frente do disco, aquecida na abertura com as
+      entradas usadas mais recentemente.
+    - Escritas (novas traduções e "último uso") vão para uma fila e são gravadas em lote
+      por uma thread própria: o caminho quente nunca espera pelo disco.
+    - Tamanho limitado em disco (max_itens) com remoção das menos usadas recentemente.
+    - Falhas de tradução ficam num cache negativo curto, só em memória, para não
+      repetir a chamada de rede a cada frame enquanto a API está fora.
+    - Busca aproximada (get_aproximado) pela chave_aproximada, gravada numa coluna indexada:
+      reaproveita a tradução de uma linha conhecida quando o OCR lê a mesma legenda com ruído.
+      Não há índice em memória para montar na abertura nem para podar quando a LRU remove linhas.
+    """
+
+    def __init__(self, arquivo: str = "traducoes.db", origem: str = "en", destino: str = "pt",
+                 max_itens: int = 200_000, max_memoria: int = 4096,
+                 ttl_falha: float = 30.0, intervalo_gravacao: float = 1.0, lote: int = 256):
+        self.arquivo = arquivo
+        self.origem = origem
+        self.destino = destino
+        self.max_itens = max_itens
+        self.max_memoria = max_memoria
+        self.ttl_falha = ttl_falha
+        self.intervalo_gravacao = intervalo_gravacao
+        self.lote = lote
+
+        self._memoria: OrderedDict[str, str] = OrderedDict()
+        self._aproximadas: dict[str, str] = {}  # chave_aproximada -> texto, das entradas em _memoria
+        self._falhas: dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+        self._escritas = queue.Queue()
+        self._encerrado = threading.Event()
+
+        self.hits_memoria = 0
+        self.hits_disco = 0
+        self.misses = 0
+
+        self._criar_tabela()
+        self._aquecer()
+
+        self._writer = threading.Thread(target=self._loop_gravacao, name="cache-traducao", daemon=True)
+        self._writer.start()
+
+        # a thread de gravação é daemon: sem isso, sair sem chamar fechar() perderia o lote pendente
+        atexit.register(self.fechar)
+
+    # ---------- SQLite ----------
+
+    def _conectar(self) -> sqlite3.Connection:
+        con = sqlite3.connect(self.arquivo, timeout=5)
+        con.execute("PRAGMA journal_mode=WAL")
+        con.execute("PRAGMA synchronous=NORMAL")
+        return con
+
+    def _conexao_leitura(self) -> sqlite3.Connection:
+        # uma conexão por thread (sqlite3 não compartilha conexão entre threads)
+        con = getattr(self._local, "con", None)
+        if con is None:
+            con = self._conectar()
+            self._local.con = con
+        return con
+
+    def _criar_tabela(self) -> None:
+        pasta = os.path.dirname(self.arquivo)
+        if pasta:
+            os.makedirs(pasta, exist_ok=True)
+
+        con = self._conectar()
+        with con:
+            con.execute(
+                "CREATE TABLE IF NOT EXISTS traducoes ("
+                " origem TEXT NOT NULL,"
+                " destino TEXT NOT NULL,"
+                " texto TEXT NOT NULL,"
+                " traducao TEXT NOT NULL,"
+                " usado_em REAL NOT NULL,"
+                " chave TEXT,"
+                " PRIMARY KEY (origem, destino, texto)"
+                ") WITHOUT ROWID"
+            )
+            con.execute("CREATE INDEX IF NOT EXISTS idx_traducoes_uso ON traducoes (usado_em)")
+
+            colunas = {c[1] for c in con.execute("PRAGMA table_info(traducoes)")}
+            if "chave" not in colunas:
+                # banco de uma versão anterior: a coluna é preenchida pela thread de gravação
+                con.execute("ALTER TABLE traducoes ADD COLUMN chave TEXT")
+        con.close()
+
+    def _preencher_chaves(self, con: sqlite3.Connection) -> None:
+        """
+        Calcula a chave_aproximada das linhas que ainda não têm (bancos antigos) e cria o índice.
+        Roda na thread de gravação, fora do caminho de abertura.
+        """
+        try:
+            con.create_function("chave_aproximada", 1, chave_aproximada, deterministic=True)
+            with con:
+                con.execute("UPDATE traducoes SET chave = chave_aproximada(texto) WHERE chave IS NULL")
+                con.execute("CREATE INDEX IF NOT EXISTS idx_traducoes_chave ON traducoes (chave)")
+        except sqlite3.Error as e:
+            print("Erro ao indexar cache de traduções:", e)
+
+    def _aquecer(self) -> None:
+        """
+        Carrega para a memória as traduções usadas mais recentemente.
+        """
+        try:
+            linhas = self._conexao_leitura().execute(
+                "SELECT texto, traducao FROM traducoes WHERE origem = ? AND destino = ?"
+                " ORDER BY usado_em DESC LIMIT ?",
+                (self.origem, self.destino, self.max_memoria)
+            ).fetchall()
+        except sqlite3.Error as e:
+            print("Erro ao carregar cache de traduções:", e)
+            return
+
+        with self._lock:
+            for texto, traducao in reversed(linhas):
+                self._memoria[texto] = traducao
+
+    # ---------- API ----------
+
+    def get(self, texto: str):
+        """
+        Retorna a tradução em cache ou None.
+        """
+        chave = normalizar_texto(texto)
+
+        with self._lock:
+            traducao = self._memoria.get(chave)
+            if traducao is not None:
+                self._memoria.move_to_end(chave)
+                self.hits_memoria += 1
+                self._escritas.put(("uso", chave, None, time.time()))
+                return traducao
+
+        try:
+            linha = self._conexao_leitura().execute(
+                "SELECT traducao FROM traducoes WHERE origem = ? AND destino = ? AND texto = ?",
+                (self.origem, self.destino, chave)
+            ).fetchone()
+        except sqlite3.Error as e:
+            print("Erro ao ler cache de traduções:", e)
+            linha = None
+
+        with self._lock:
+            if linha is None:
+                self.misses += 1
+                return None
+
+            self.hits_disco += 1
+            self._lembrar(chave, linha[0])
+
+        self._escritas.put(("uso", chave, None, time.time()))
+        return linha[0]
+
+    def put(self, texto: str, traducao: str) -> None:
+        chave = normalizar_texto(texto)
+        if not chave or not traducao:
+            return
+
+        with self._lock:
+            self._lembrar(chave, traducao)
+            self._falhas.pop(chave, None)
+
+        self._escritas.put(("novo", chave, traducao, time.time()))
+
+    def get_aproximado(self, texto: str):
+        """
+        Procura uma linha já traduzida que difere de texto só por ruído de OCR (mesma chave_aproximada).
+        Retorna (texto_conhecido, tradução) ou None.
+        """
+        chave = chave_aproximada(texto)
+        if not chave:
+            return None
+
+        with self._lock:
+            conhecido = self._aproximadas.get(chave)
+
+        if conhecido is not None:
+            traducao = self.get(conhecido)
+            if traducao is not None:
+                return conhecido, traducao
+
+        try:
+            # "+" impede o planner de preferir a chave primária (origem, destino) ao índice da chave
+            linha = self._conexao_leitura().execute(
+                "SELECT texto, traducao FROM traducoes WHERE chave = ? AND +origem = ? AND +destino = ? LIMIT 1",
+                (chave, self.origem, self.destino)
+            ).fetchone()
+        except sqlite3.Error as e:
+            print("Erro ao ler cache de traduções:", e)
+            return None
+
+        if linha is None:
+            return None
+
+        with self._lock:
+            self._lembrar(linha[0], linha[1])
+
+        self._escritas.put(("uso", linha[0], None, time.time()))
+        return linha[0], linha[1]
+
+    def marcar_falha(self, texto: str) -> None:
+        with self._lock:
+            self._falhas[normalizar_texto(texto)] = time.monotonic() + self.ttl_falha
+
+    def falhou_recentemente(self, texto: str) -> bool:
+        chave = normalizar_texto(texto)
+        with self._lock:
+            expira = self._falhas.get(chave)
+            if expira is None:
+                return False
+            if expira < time.monotonic():
+                del self._falhas[chave]
+                return False
+            return True
+
+    def estatisticas(self) -> dict:
+        with self._lock:
+            total = self.hits_memoria + self.hits_disco + self.misses
+            return {
+                "memoria": len(self._memoria),
+                "hits_memoria": self.hits_memoria,
+                "hits_disco": self.hits_disco,
+                "misses": self.misses,
+                "taxa_acerto": ((self.hits_memoria + self.hits_disco) / total) if total else 0.0,
+            }
+
+    def fechar(self) -> None:
+        """
+        Grava o que estiver pendente e encerra a thread de gravação. Pode ser chamado mais de uma vez.
+        """
+        if self._encerrado.is_set():
+            return
+
+        atexit.unregister(self.fechar)
+        self._encerrado.set()
+        self._escritas.put(None)
+        self._writer.join(timeout=5)
+
+    def _lembrar(self, chave: str, traducao: str) -> None:
+        # chamado com self._lock
+        self._memoria[chave] = traducao
+        self._memoria.move_to_end(chave)
+        self._aproximadas[chave_aproximada(chave)] = chave
+        while len(self._memoria) > self.max_memoria:
+            antigo, _ = self._memoria.popitem(last=False)
+            aproximada = chave_aproximada(antigo)
+            if self._aproximadas.get(aproximada) == antigo:
+                del self._aproximadas[aproximada]
+
+    # ---------- Gravação em lote ----------
+
+    def _loop_gravacao(self) -> None:
+        con = self._conectar()
+        self._preencher_chaves(con)
+        try:
+            while True:
+                pendentes = self._coletar_lote()
+                if pendentes:
+                    self._gravar(con, pendentes)
+
+                if self._encerrado.is_set() and self._escritas.empty():
+                    return
+        finally:
+            con.close()
+
+    def _coletar_lote(self) -> list:
+        try:
+            item = self._escritas.get(timeout=self.intervalo_gravacao)
+        except queue.Empty:
+            return []
+
+        pendentes = [] if item is None else [item]
+        limite = time.monotonic() + self.intervalo_gravacao
+
+        while len(pendentes) < self.lote and time.monotonic() < limite:
+            try:
+                item = self._escritas.get(timeout=max(0.0, limite - time.monotonic()))
+            except queue.Empty:
+                break
+            if item is None:
+                break
+            pendentes.append(item)
+
+        return pendentes
+
+    def _gravar(self, con: sqlite3.Connection, pendentes: list) -> None:
+        novos = [
+            (self.origem, self.destino, chave, traducao, ts, chave_aproximada(chave))
+            for tipo, chave, traducao, ts in pendentes if tipo == "novo"
+        ]
+        usos = [
+            (ts, self.origem, self.destino, chave)
+            for tipo, chave, _, ts in pendentes if tipo == "uso"
+        ]
+
+        try:
+            with con:
+                if novos:
+                    con.executemany(
+                        "INSERT OR REPLACE INTO traducoes (origem, destino, texto, traducao, usado_em, chave)"
+                        " VALUES (?, ?, ?, ?, ?, ?)",
+                        novos
+                    )
+                if usos:
+                    con.executemany(
+                        "UPDATE traducoes SET usado_em = ? WHERE origem = ? AND destino = ? AND texto = ?",
+                        usos
+                    )
+                if novos:
+                    self._remover_excedentes(con)
+        except sqlite3.Error as e:
+            print("Erro ao gravar cache de traduções:", e)
+
+    def _remover_excedentes(self, con: sqlite3.Connection) -> None:
+        (total,) = con.execute("SELECT COUNT(*) FROM traducoes").fetchone()
+        excesso = total - self.max_itens
+        if excesso <= 0:
+            return
+
+        con.execute(
+            "DELETE FROM traducoes WHERE (origem, destino, texto) IN"
+            " (SELECT origem, destino, texto FROM traducoes ORDER BY usado_em LIMIT ?)",
+            (excesso,)
+        )
@@ -1,9 +1,170 @@
 # dictionary.py
+import os
 import re
+import threading
+import time
 import unicodedata
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 import requests
 
-_CACHE: dict[str, str] = {}
+MSG_NAO_ENCONTRADA = "Nenhuma definição encontrada."
+MSG_SEM_RESPOSTA = "O dicionário não respondeu a tempo. Tente novamente."
+
+
+class CacheDicionario:
+    """
+    Cache de definições com limite de memória (LRU), seguro entre threads.
+
+    - Cada definição é guardada uma vez, na forma em que foi encontrada; a palavra original
+      guarda só uma referência para essa forma ("(Forma normalizada: ...)" é montado na leitura).
+    - Resultados negativos ("nenhuma definição") expiram depois de ttl_negativo segundos,
+      para uma falha de rede ou um prazo estourado não ficarem valendo para sempre.
+    - Contadores de hits, misses e remoções (estatisticas()).
+    """
+
+    _DEF, _REF, _NEG = 0, 1, 2
+
+    def __init__(self, max_chars: int = 2_000_000, max_itens: int = 20_000, ttl_negativo: float = 300.0):
+        self.max_chars = max_chars
+        self.max_itens = max_itens
+        self.ttl_negativo = ttl_negativo
+
+        self._itens: OrderedDict[str, tuple[int, object]] = OrderedDict()
+        self._chars = 0
+        self._lock = threading.RLock()
+
+        self.hits = 0
+        self.misses = 0
+        self.remocoes = 0
+
+    @staticmethod
+    def _tamanho(chave: str, item) -> int:
+        tipo, valor = item
+        return len(chave) + (len(valor) if tipo in (CacheDicionario._DEF, CacheDicionario._REF) else 0)
+
+    def _resolver(self, chave: str):
+        # chamado com self._lock; retorna o texto pronto ou None
+        item = self._itens.get(chave)
+        if item is None:
+            return None
+
+        tipo, valor = item
+
+        if tipo == self._NEG:
+            if valor < time.monotonic():
+                self._remover(chave)
+                return None
+            return MSG_NAO_ENCONTRADA
+
+        if tipo == self._REF:
+            alvo = self._itens.get(valor)
+            if alvo is None or alvo[0] != self._DEF:
+                # a definição referenciada já saiu do cache
+                self._remover(chave)
+                return None
+            self._itens.move_to_end(valor)
+            texto = f"(Forma normalizada: {valor})\n\n{alvo[1]}"
+        else:
+            texto = valor
+
+        self._itens.move_to_end(chave)
+        return texto
+
+    def get(self, palavra: str):
+        """
+        Resposta pronta para a palavra (definição, forma normalizada ou mensagem negativa) ou None.
+        """
+        with self._lock:
+            texto = self._resolver(palavra)
+            if texto is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return texto
+
+    def definicao(self, forma: str):
+        """
+        Só definições positivas, guardadas exatamente para essa forma.
+        """
+        with self._lock:
+            item = self._itens.get(forma)
+            if item is None or item[0] != self._DEF:
+                return None
+            self._itens.move_to_end(forma)
+            return item[1]
+
+    def __contains__(self, palavra: str) -> bool:
+        with self._lock:
+            return self._resolver(palavra) is not None
+
+    def put(self, forma: str, definicao: str) -> None:
+        self._guardar(forma, (self._DEF, definicao))
+
+    def put_referencia(self, palavra: str, forma: str) -> None:
+        self._guardar(palavra, (self._REF, forma))
+
+    def put_negativo(self, palavra: str) -> None:
+        self._guardar(palavra, (self._NEG, time.monotonic() + self.ttl_negativo))
+
+    def _guardar(self, chave: str, item) -> None:
+        with self._lock:
+            if chave in self._itens:
+                self._remover(chave)
+
+            self._itens[chave] = item
+            self._chars += self._tamanho(chave, item)
+
+            while self._itens and (len(self._itens) > self.max_itens or self._chars > self.max_chars):
+                antiga = next(iter(self._itens))
+                self._remover(antiga)
+                self.remocoes += 1
+
+    def _remover(self, chave: str) -> None:
+        item = self._itens.pop(chave)
+        self._chars -= self._tamanho(chave, item)
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._itens.clear()
+            self._chars = 0
+
+    def estatisticas(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "itens": len(self._itens),
+                "chars": self._chars,
+                "hits": self.hits,
+                "misses": self.misses,
+                "remocoes": self.remocoes,
+                "taxa_acerto": (self.hits / total) if total else 0.0,
+            }
+
+
+_CACHE = CacheDicionario()
+
+# prazo total de uma consulta (todas as fontes e variações juntas)
+PRAZO_CONSULTA = 6.0
+
+# sessão compartilhada: conexões keep-alive reaproveitadas entre consultas
+_SESSAO = requests.Session()
+_SESSAO.mount("https://", requests.adapters.HTTPAdapter(pool_connections=2, pool_maxsize=8))
+
+# índice offline gerado por indice_dicionario.py (consultado antes das APIs, se existir)
+ARQUIVO_INDICE_OFFLINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dicionario.db")
+_INDICE_OFFLINE = None
+_INDICE_CARREGADO = False
+
+_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix="dicionario")
+
+# consultas completas (uma por popup) rodam num pool separado, para não disputar
+# os workers das requisições HTTP que elas mesmas disparam
+_EXECUTOR_CONSULTAS = ThreadPoolExecutor(max_workers=4, thread_name_prefix="consulta-dicionario")
+
+# requisições do prefetcher: pool próprio e pequeno, para nunca ocupar os workers
+# que a consulta de um clique (popup) precisa
+_EXECUTOR_PREFETCH = ThreadPoolExecutor(max_workers=2, thread_name_prefix="prefetch-http")
 
 
 def _limpar_palavra(palavra: str) -> str:
@@ -82,13 +243,18 @@ def gerar_variacoes(palavra: str) -> list[str]:
 
 # ------------------ Fonte 1: dicionario-aberto ------------------
 
-def _buscar_dicionario_aberto(palavra: str) -> str:
+def _buscar_dicionario_aberto(palavra: str, timeout: float = 4):
+    """
+    Retorna a definição, "" se a palavra não existe na fonte ou None se a fonte falhou.
+    """
     try:
         url = f"https://api.dicionario-aberto.net/word/{palavra}"
-        r = requests.get(url, timeout=4)
+        r = _SESSAO.get(url, timeout=timeout)
 
-        if r.status_code != 200:
+        if r.status_code == 404:
             return ""
+        if r.status_code != 200:
+            return None
 
         data = r.json()
         if not data:
@@ -99,25 +265,32 @@ def _buscar_dicionario_aberto(palavra: str) -> str:
         if not xml:
             return ""
 
-        texto = (
-            xml.replace("<br/>", "\n")
-               .replace("<br />", "\n")
-               .replace("<br>", "\n")
-        )
-        texto = re.sub(r"<[^>]+>", "", texto)
-        texto = re.sub(r"\n{3,}", "\n\n", texto).strip()
-
-        return texto[:2500]
+        return limpar_xml_definicao(xml)
     except Exception:
-        return ""
+        return None
+
+
+def limpar_xml_definicao(xml: str) -> str:
+    """
+    Converte o XML de um verbete (dicionario-aberto) em texto simples.
+    """
+    texto = (
+        xml.replace("<br/>", "\n")
+           .replace("<br />", "\n")
+           .replace("<br>", "\n")
+    )
+    texto = re.sub(r"<[^>]+>", "", texto)
+    texto = re.sub(r"\n{3,}", "\n\n", texto).strip()
+
+    return texto[:2500]
 
 
 # ------------------ Fonte 2: Wiktionary (PT) ------------------
 
-def _buscar_wiktionary_pt(palavra: str) -> str:
+def _buscar_wiktionary_pt(palavra: str, timeout: float = 4):
     """
     Busca o extrato do Wiktionary em português via API do MediaWiki.
-    Retorna texto limpo ou vazio.
+    Retorna texto limpo, vazio se não houver verbete ou None se a fonte falhou.
     """
     try:
         url = "https://pt.wiktionary.org/w/api.php"
@@ -131,9 +304,9 @@ def _buscar_wiktionary_pt(palavra: str) -> str:
             "titles": palavra
         }
 
-        r = requests.get(url, params=params, timeout=4)
+        r = _SESSAO.get(url, params=params, timeout=timeout)
         if r.status_code != 200:
-            return ""
+            return None
 
         data = r.json()
         pages = data.get("query", {}).get("pages", {})
@@ -154,52 +327,255 @@ def _buscar_wiktionary_pt(palavra: str) -> str:
         return extract[:2500]
 
     except Exception:
-        return ""
+        return None
+
+
+def _indice_offline():
+    """
+    Abre (uma vez) o índice offline, se o arquivo existir.
+    """
+    global _INDICE_OFFLINE, _INDICE_CARREGADO
+
+    if not _INDICE_CARREGADO:
+        _INDICE_CARREGADO = True
+        if os.path.exists(ARQUIVO_INDICE_OFFLINE):
+            from indice_dicionario import IndiceDicionario
+            try:
+                _INDICE_OFFLINE = IndiceDicionario(ARQUIVO_INDICE_OFFLINE)
+            except Exception as e:
+                print("Erro ao abrir índice offline do dicionário:", e)
+
+    return _INDICE_OFFLINE
+
+
+def _resposta(original: str, t: str, definicao: str) -> str:
+    _CACHE.put(t, definicao)
+    if t != original:
+        # a definição fica guardada uma vez (em t); original só aponta para ela
+        _CACHE.put_referencia(original, t)
+        return f"(Forma normalizada: {t})\n\n{definicao}"
+    return definicao
+
+
+def _consultar_em_paralelo(tentativas: list[str], prazo: float, cancelado: threading.Event = None,
+                           executor: ThreadPoolExecutor = _EXECUTOR):
+    """
+    Dispara todas as consultas (variação x fonte) ao mesmo tempo e resolve por prioridade:
+    ordem das variações e, em cada uma, dicionario-aberto antes do Wiktionary.
+    Cada requisição recebe como timeout só o que resta do prazo total, então nenhuma segura
+    um worker depois dele; assim que a resposta está definida, as que não começaram nem saem.
+    Retorna (variação, definição), ou None se todas as fontes responderam e nenhuma tem a palavra.
+    Levanta TimeoutError se o prazo acabou (ou alguma fonte falhou) antes de uma resposta definitiva.
+    """
+    limite = time.monotonic() + prazo
+    resolvido = threading.Event()
+
+    def _consultar(fonte, t):
+        restante = limite - time.monotonic()
+        if restante <= 0 or resolvido.is_set() or (cancelado is not None and cancelado.is_set()):
+            return None  # não consultada
+        return fonte(t, restante)
+
+    fontes = (_buscar_dicionario_aberto, _buscar_wiktionary_pt)
+    ordem = [(t, fonte) for t in tentativas for fonte in fontes]
 
+    futuros = [executor.submit(_consultar, fonte, t) for t, fonte in ordem]
+    pendentes = set(futuros)
 
-def buscar_significado_pt(palavra: str) -> str:
+    try:
+        while True:
+            # a melhor resposta é a primeira não vazia na ordem de prioridade,
+            # mas só vale se todas as de prioridade maior já terminaram sem ela
+            sem_resposta = False
+            for (t, _), f in zip(ordem, futuros):
+                if not f.done():
+                    break
+                definicao = None if f.cancelled() else f.result()
+                if definicao:
+                    return t, definicao
+                if definicao is None:
+                    sem_resposta = True
+            else:
+                if sem_resposta:
+                    raise TimeoutError("consulta ao dicionário sem resposta de todas as fontes")
+                return None
+
+            if cancelado is not None and cancelado.is_set():
+                return None
+
+            restante = limite - time.monotonic()
+            if restante <= 0:
+                # prazo acabou com fontes de prioridade maior pendentes: fica com a melhor que chegou
+                for (t, _), f in zip(ordem, futuros):
+                    if f.done() and not f.cancelled() and f.result():
+                        return t, f.result()
+                raise TimeoutError("prazo da consulta ao dicionário esgotado")
+
+            # acorda periodicamente para perceber cancelamento
+            _, pendentes = wait(pendentes, timeout=min(restante, 0.2), return_when=FIRST_COMPLETED)
+    finally:
+        resolvido.set()
+        for f in futuros:
+            f.cancel()
+
+
+def buscar_significado_pt(palavra: str, prazo: float = PRAZO_CONSULTA,
+                          cancelado: threading.Event = None, prioridade_baixa: bool = False) -> str:
+    """
+    Definição da palavra: cache, índice offline e, por fim, as APIs em paralelo.
+    prioridade_baixa=True (prefetch) usa o pool pequeno de requisições, separado do dos cliques.
+    """
     original = _limpar_palavra(palavra)
     if not original:
         return "Palavra inválida."
 
-    if original in _CACHE:
-        return _CACHE[original]
+    em_cache = _CACHE.get(original)
+    if em_cache is not None:
+        return em_cache
 
     tentativas = gerar_variacoes(original)
 
+    # índice offline: responde sem rede quando a palavra está no dump local
+    indice = _indice_offline()
+    if indice is not None:
+        achado = indice.buscar(tentativas)
+        if achado:
+            t, definicao = achado
+            return _resposta(original, t, definicao)
+
+    # cache para tentativas também
     for t in tentativas:
-        # cache para tentativas também
-        if t in _CACHE and _CACHE[t]:
-            definicao = _CACHE[t]
-            if t != original:
-                resp = f"(Forma normalizada: {t})\n\n{definicao}"
-                _CACHE[original] = resp
-                return resp
-            _CACHE[original] = definicao
-            return definicao
-
-        # 1) tenta dicionario-aberto
-        definicao = _buscar_dicionario_aberto(t)
+        definicao = _CACHE.definicao(t)
         if definicao:
-            _CACHE[t] = definicao
-            if t != original:
-                resp = f"(Forma normalizada: {t})\n\n{definicao}"
-                _CACHE[original] = resp
-                return resp
-            _CACHE[original] = definicao
-            return definicao
-
-        # 2) fallback Wiktionary
-        definicao = _buscar_wiktionary_pt(t)
-        if definicao:
-            _CACHE[t] = definicao
-            if t != original:
-                resp = f"(Forma normalizada: {t})\n\n{definicao}"
-                _CACHE[original] = resp
-                return resp
-            _CACHE[original] = definicao
-            return definicao
-
-    msg = "Nenhuma definição encontrada."
-    _CACHE[original] = msg
-    return msg
+            return _resposta(original, t, definicao)
+
+    executor = _EXECUTOR_PREFETCH if prioridade_baixa else _EXECUTOR
+    try:
+        achado = _consultar_em_paralelo(tentativas, prazo, cancelado, executor)
+    except TimeoutError:
+        # prazo estourado ou fonte fora do ar não quer dizer que a palavra não existe: não vai para o cache
+        return MSG_SEM_RESPOSTA
+
+    if achado:
+        t, definicao = achado
+        return _resposta(original, t, definicao)
+
+    # cancelada: não grava "nenhuma definição" no cache
+    if cancelado is not None and cancelado.is_set():
+        return ""
+
+    # todas as fontes responderam e nenhuma tem a palavra
+    _CACHE.put_negativo(original)
+    return MSG_NAO_ENCONTRADA
+
+
+class ConsultaSignificado:
+    """
+    Consulta de significado em segundo plano (não bloqueia o Tk).
+    ao_terminar(callback) recebe o texto na thread do worker: a UI deve repassar via after().
+    cancelar() interrompe a consulta e descarta o resultado.
+    """
+
+    def __init__(self, palavra: str, prazo: float = PRAZO_CONSULTA):
+        self.palavra = palavra
+        self.cancelado = threading.Event()
+        self.futuro = _EXECUTOR_CONSULTAS.submit(buscar_significado_pt, palavra, prazo, self.cancelado)
+
+    def ao_terminar(self, callback) -> None:
+        def _feito(futuro):
+            if futuro.cancelled() or self.cancelado.is_set():
+                return
+            try:
+                significado = futuro.result()
+            except Exception as e:
+                print("Erro ao consultar dicionário:", e)
+                significado = "Erro ao consultar o dicionário."
+            callback(significado)
+
+        self.futuro.add_done_callback(_feito)
+
+    def cancelar(self) -> None:
+        self.cancelado.set()
+        self.futuro.cancel()
+
+
+# palavras funcionais: não vale a pena pré-carregar
+STOPWORDS_PT = frozenset("""
+a à ao aos as às até com como da das de dela dele do dos e é ela elas ele eles em entre era
+essa esse esta está estão este eu foi há isso isto já la lhe mais mas me meu minha muito na
+não nas nem no nos nós o os ou para pela pelo por porque qual quando que quem se sem ser seu
+sua são também te tem tu tua um uma você vocês vai vou sim aqui ali lá então só
+""".split())
+
+
+class PrefetcherSignificados:
+    """
+    Pré-carrega (em segundo plano, uma consulta por vez, com limite de ritmo e num pool de
+    requisições próprio, que não disputa com os cliques) as definições
+    das palavras de conteúdo da tradução atual, para o clique abrir o popup na hora.
+    Quando a legenda muda, o trabalho da legenda anterior é cancelado.
+    """
+
+    def __init__(self, intervalo: float = 1.0, min_letras: int = 4, max_palavras: int = 8):
+        self.intervalo = intervalo        # espaço mínimo entre duas consultas
+        self.min_letras = min_letras
+        self.max_palavras = max_palavras
+
+        self._cond = threading.Condition()
+        self._fila: list[str] = []
+        self._cancelado = threading.Event()
+        self._encerrado = False
+
+        self.consultas = 0
+
+        self._thread = threading.Thread(target=self._run, name="prefetch-dicionario", daemon=True)
+        self._thread.start()
+
+    def _palavras_conteudo(self, texto: str) -> list[str]:
+        out = []
+        for token in re.findall(r"\w+", texto or "", re.UNICODE):
+            p = _limpar_palavra(token)
+            if len(p) < self.min_letras or p in STOPWORDS_PT or p.isdigit():
+                continue
+            if p in _CACHE or p in out:
+                continue
+            out.append(p)
+        return out[:self.max_palavras]
+
+    def agendar(self, texto_pt: str) -> None:
+        """
+        Substitui o trabalho pendente pelas palavras da nova tradução.
+        """
+        palavras = self._palavras_conteudo(texto_pt)
+
+        with self._cond:
+            # cancela a consulta em andamento da legenda anterior
+            self._cancelado.set()
+            self._cancelado = threading.Event()
+            self._fila = palavras
+            self._cond.notify()
+
+    def encerrar(self) -> None:
+        with self._cond:
+            self._encerrado = True
+            self._cancelado.set()
+            self._fila = []
+            self._cond.notify()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._fila and not self._encerrado:
+                    self._cond.wait()
+                if self._encerrado:
+                    return
+
+                palavra = self._fila.pop(0)
+                cancelado = self._cancelado
+
+            if palavra not in _CACHE:
+                buscar_significado_pt(palavra, cancelado=cancelado, prioridade_baixa=True)
+                self.consultas += 1
+
+                # limite de ritmo (acorda antes se for cancelado/encerrado)
+                cancelado.wait(self.intervalo)
@@ -0,0 +1,172 @@
+"""
+Índice offline do dicionário.
+
+Converte um dump local de dicionário em um SQLite compacto, com as chaves já normalizadas
+(_limpar_palavra / _remover_acentos), para o dictionary.py responder sem rede.
+
+Formatos aceitos:
+- XML TEI (dump do dicionario-aberto): <entry><form><orth>palavra</orth></form>...</entry>
+- TSV: palavra<TAB>definição (uma por linha)
+- JSONL: {"palavra": ..., "definicao": ...} (ou {"word": ..., "xml": ...})
+
+Uso:
+    python indice_dicionario.py dump.xml -o dicionario.db
+"""
+import argparse
+import json
+import os
+import sqlite3
+import threading
+import zlib
+import xml.etree.ElementTree as ET
+
+from dictionary import ARQUIVO_INDICE_OFFLINE, _limpar_palavra, _remover_acentos, limpar_xml_definicao
+
+# prioridade das chaves de um verbete: forma exata antes da forma sem acento
+PRIORIDADE_EXATA = 0
+PRIORIDADE_SEM_ACENTO = 1
+
+
+class IndiceDicionario:
+    """
+    Leitura do índice offline (somente leitura, uma conexão por thread).
+    """
+
+    def __init__(self, arquivo: str = ARQUIVO_INDICE_OFFLINE):
+        self.arquivo = arquivo
+        self._local = threading.local()
+        self._conexao()  # falha cedo se o arquivo não for um índice válido
+
+    def _conexao(self) -> sqlite3.Connection:
+        con = getattr(self._local, "con", None)
+        if con is None:
+            con = sqlite3.connect(f"file:{self.arquivo}?mode=ro", uri=True, check_same_thread=False)
+            con.execute("SELECT 1 FROM definicoes LIMIT 1")
+            self._local.con = con
+        return con
+
+    def buscar(self, tentativas: list[str]):
+        """
+        Procura as variações (já na ordem de prioridade de gerar_variacoes) numa única consulta.
+        Retorna (variação, definição) ou None.
+        """
+        if not tentativas:
+            return None
+
+        marcadores = ",".join("?" * len(tentativas))
+        linhas = self._conexao().execute(
+            f"SELECT chave, prioridade, definicao FROM definicoes WHERE chave IN ({marcadores})",
+            tentativas
+        ).fetchall()
+
+        if not linhas:
+            return None
+
+        ordem = {t: i for i, t in enumerate(tentativas)}
+        chave, _, definicao = min(linhas, key=lambda l: (ordem[l[0]], l[1]))
+        return chave, zlib.decompress(definicao).decode("utf-8")
+
+
+# ------------------ Importação ------------------
+
+def _ler_xml(caminho: str):
+    for _, elem in ET.iterparse(caminho, events=("end",)):
+        if not elem.tag.endswith("entry"):
+            continue
+
+        orth = next((e for e in elem.iter() if e.tag.endswith("orth")), None)
+        if orth is not None and orth.text:
+            yield orth.text, limpar_xml_definicao(ET.tostring(elem, encoding="unicode"))
+
+        elem.clear()
+
+
+def _ler_tsv(caminho: str):
+    with open(caminho, "r", encoding="utf-8") as f:
+        for linha in f:
+            palavra, sep, definicao = linha.rstrip("\n").partition("\t")
+            if sep:
+                yield palavra, definicao.replace("\\n", "\n").strip()
+
+
+def _ler_jsonl(caminho: str):
+    with open(caminho, "r", encoding="utf-8") as f:
+        for linha in f:
+            if not linha.strip():
+                continue
+            item = json.loads(linha)
+            palavra = item.get("palavra") or item.get("word") or ""
+            if "xml" in item:
+                definicao = limpar_xml_definicao(item["xml"] or "")
+            else:
+                definicao = (item.get("definicao") or "").strip()
+            yield palavra, definicao
+
+
+def ler_dump(caminho: str):
+    ext = os.path.splitext(caminho)[1].lower()
+    if ext == ".xml":
+        return _ler_xml(caminho)
+    if ext in (".jsonl", ".json"):
+        return _ler_jsonl(caminho)
+    return _ler_tsv(caminho)
+
+
+def importar(origem: str, destino: str = ARQUIVO_INDICE_OFFLINE) -> int:
+    """
+    Gera o índice a partir do dump. Verbetes homógrafos são juntados numa única definição.
+    Retorna o número de chaves gravadas.
+    """
+    verbetes: dict[tuple[str, int], list[str]] = {}
+
+    for palavra, definicao in ler_dump(origem):
+        chave = _limpar_palavra(palavra)
+        if not chave or not definicao:
+            continue
+
+        verbetes.setdefault((chave, PRIORIDADE_EXATA), []).append(definicao)
+
+        sem_acento = _remover_acentos(chave)
+        if sem_acento != chave:
+            verbetes.setdefault((sem_acento, PRIORIDADE_SEM_ACENTO), []).append(definicao)
+
+    tmp = destino + ".tmp"
+    if os.path.exists(tmp):
+        os.remove(tmp)
+
+    con = sqlite3.connect(tmp)
+    with con:
+        con.execute(
+            "CREATE TABLE definicoes ("
+            " chave TEXT NOT NULL,"
+            " prioridade INTEGER NOT NULL,"
+            " definicao BLOB NOT NULL,"
+            " PRIMARY KEY (chave, prioridade)"
+            ") WITHOUT ROWID"
+        )
+        con.executemany(
+            "INSERT INTO definicoes (chave, prioridade, definicao) VALUES (?, ?, ?)",
+            (
+                (chave, prioridade, zlib.compress("\n\n".join(defs)[:5000].encode("utf-8"), 9))
+                for (chave, prioridade), defs in verbetes.items()
+            )
+        )
+    con.execute("VACUUM")
+    con.close()
+
+    os.replace(tmp, destino)
+    return len(verbetes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera o índice offline do dicionário a partir de um dump local.")
+    parser.add_argument("dump", help="arquivo do dump (.xml TEI, .tsv ou .jsonl)")
+    parser.add_argument("-o", "--saida", default=ARQUIVO_INDICE_OFFLINE, help="arquivo SQLite de saída")
+    args = parser.parse_args()
+
+    total = importar(args.dump, args.saida)
+    print(f"{total} chaves gravadas em {args.saida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,19 @@
-import time
 import threading
+import time
 import easyocr
-import re
 
 from app import App
+from cache_ocr import CacheOcr, CAMPOS_OCR
+from cache_traducao import CacheTraducao, mesma_legenda
+from pipeline import Pipeline
+from metricas import METRICAS
+from traducao import ServicoTraducao, TradutorAssincrono
+from ocr import LeitorOcr
+from agendador import AgendadorCaptura
 from overlay import selecionar_area
-from opencv import CONFIG, capturar_tela, preprocessar_imagem, imagem_mudou, gerar_preview_ocr, cv2_to_png_bytes
-from deep_translator import GoogleTranslator
+from opencv import CONFIG, CAMPOS_PREPROCESSAMENTO, CapturadorTela, EscalaAutomatica, preprocessar_imagem, assinatura_imagem, pegada_texto, imagem_mudou, gerar_preview_ocr, cv2_to_ppm_bytes
+from tradutores import criar_tradutor
+from dictionary import PrefetcherSignificados
 
 
 def main():
@@ -15,7 +22,7 @@ def main():
         Configuração de botão. Abre Overlay para o usuário apontar a área de captura de legendas
         """
 
-        nonlocal CAPTURE_AREA, frame_anterior, ultima_legenda
+        nonlocal CAPTURE_AREA, assinatura_anterior, ultima_legenda
 
         app.update_texts("Selecione a área na tela...", "")
 
@@ -26,11 +33,15 @@ def main():
             return
 
         CAPTURE_AREA = nova_area
-        frame_anterior = None
+        assinatura_anterior = None
+        leitor_ocr.invalidar_caixas()
+        escala_auto.resetar()
         ultima_legenda = ""
 
         print(f'CAPTURE_AREA = {CAPTURE_AREA}')
 
+        agendador.acordar()
+
         app.update_texts("Área atualizada! Aguardando legendas...", "")
 
     def pausar_ou_retomar():
@@ -48,182 +59,214 @@ def main():
             # estava rodando -> pausa
             pause_event.set()
             force_read_event.clear()  # evita OCR pendente
+            tradutor.cancelar()       # resposta atrasada não sobrescreve o aviso de pausa
             texto_pt_atual = "⏸ Tradução pausada"
 
+        publicar_textos()
+
+        agendador.acordar()
+
     def ler_novamente() -> None:
         """
         Configuração de botão. Força nova leitura do OCR
         """
         force_read_event.set()
+        agendador.acordar()
 
     def sair() -> None:
         """
-        Configuração de botão. Encerra o programa
+        Configuração de botão (e do X da janela). Encerra o programa
         """
-        stop_event.set()
+        encerrar()
         app.destroy()
 
-    def extrair_texto(img, cfg, conf_min=0.40) -> str:
+    def encerrar() -> None:
+        """
+        Para as threads e grava os caches. Também roda quando o mainloop termina, para cobrir
+        qualquer forma de fechar a janela (X do gerenciador de janelas, área cancelada, erro).
+        """
+        if stop_event.is_set():
+            return  # já encerrado
+
+        stop_event.set()
+        agendador.acordar()
+        pipeline.encerrar()
+        tradutor.encerrar()
+        cache_ocr.salvar()
+        cache_traducoes.fechar()
+        translator.fechar()
+        if prefetcher is not None:
+            prefetcher.encerrar()
+
+    def extrair_texto(img, cfg, conf_min=0.40, pegada=None) -> str:
         """
         Identifica e extrai o texto (En-US) na imagem
         """
-        resultado = reader.readtext(
-            img,
-            detail=1,
-            paragraph=False,
-            text_threshold=cfg.text_threshold,
-            low_text=cfg.low_text,
-            link_threshold=cfg.link_threshold
-        )
-
-        textos_validos = []
-
-        for item in resultado:
-            # Formatos possíveis:
-            # 1) (bbox, texto, conf)
-            # 2) (bbox, texto)
-            if len(item) == 3:
-                bbox, texto, conf = item
-            elif len(item) == 2:
-                bbox, texto = item
-                conf = 1.0  # sem score -> assume confiança alta (ou você pode ignorar)
-            else:
-                continue
-
-            if not texto:
-                continue
-
-            # conf pode vir como string em alguns casos -> força float
-            try:
-                conf = float(conf)
-            except Exception:
-                conf = 0.0
-
-            if conf < conf_min:
-                continue
-
-            texto = texto.strip()
-            texto = re.sub(r"\s+", " ", texto)
-
-            # ignora lixo: só símbolos ou muito curto
-            if len(texto) < 2:
-                continue
-            if re.fullmatch(r"[\W_]+", texto):
-                continue
-
-            textos_validos.append(texto)
-
-        texto_final = " ".join(textos_validos).strip()
-        texto_final = limpar_pontuacao(texto_final)
-        return texto_final
-
-    def limpar_pontuacao(texto: str) -> str:
+        return leitor_ocr.extrair_texto(img, cfg, conf_min, pegada)
+
+    def traduzir_texto(texto) -> str:
+        """
+        Envia a string de texto fornecida em En-US para o backend de tradução (Google Translator
+        por padrão), que retorna a sua versão traduzida em Pt-BR.
+        Traduz por unidades (linhas/frases), com cache; ver ServicoTraducao.
+        """
+        return servico_traducao.traduzir(texto)
+
+    def loop_traducao() -> None:
         """
-        Realiza pós processamento do texto para aprimor caracteres de pontuação
+        Estágio de captura do pipeline. Captura a tela, detecta quando a legenda mudou e
+        publica o frame para os próximos estágios (pré-processamento -> OCR -> tradução),
+        que rodam em threads próprias. Nunca espera pelo OCR nem pela tradução.
         """
-        texto = texto.strip()
+        nonlocal assinatura_anterior
 
-        # remove espaços antes de pontuação: "hello ," -> "hello,"
-        texto = re.sub(r"\s+([,.;:!?])", r"\1", texto)
+        # sessão de captura pertence a esta thread e é recriada quando CAPTURE_AREA muda
+        with CapturadorTela() as capturador:
+            # o agendador bloqueia enquanto pausado e define o ritmo do polling
+            while agendador.aguardar():
 
-        # garante espaço depois de pontuação quando necessário: "hello,world" -> "hello, world"
-        texto = re.sub(r"([,.;:!?])([A-Za-z])", r"\1 \2", texto)
+                cfg = CONFIG.get()
 
-        # junta reticências quebradas: ". . ." -> "..."
-        texto = re.sub(r"\.\s*\.\s*\.", "...", texto)
+                with METRICAS.medir("captura"):
+                    frame = capturador.capturar(CAPTURE_AREA)
+                if frame is None:
+                    continue
 
-        # junta dois pontos " .. " -> "..."
-        texto = re.sub(r"\.\.", "...", texto)
+                METRICAS.contar("frames_capturados")
+                t_frame = time.perf_counter()
 
-        # remove múltiplos espaços
-        texto = re.sub(r"\s+", " ", texto)
+                precisa_forcar = force_read_event.is_set()
 
-        return texto
+                # compara só a miniatura em cinza (alguns bytes), não o frame inteiro
+                with METRICAS.medir("mudanca"):
+                    assinatura = assinatura_imagem(frame, usar_mascara_texto=bool(int(cfg.diff_mascara_texto)))
+                    mudou = assinatura_anterior is None or imagem_mudou(assinatura, assinatura_anterior, cfg.diff_threshold)
 
-    def traduzir_texto(texto) -> str:
+                if (not precisa_forcar) and not mudou:
+                    METRICAS.contar("frames_sem_mudanca")
+                    continue
+
+                if (not precisa_forcar) and not agendador.ocr_liberado():
+                    # mudou, mas o último OCR foi há pouco: reavalia no próximo tick (frame mais novo)
+                    METRICAS.contar("frames_adiados")
+                    agendador.registrar_mudanca()
+                    continue
+
+                assinatura_anterior = assinatura
+
+                force_read_event.clear()
+                agendador.registrar_ocr()
+
+                # cada grab do mss vem num buffer novo: o frame segue para a outra thread sem cópia
+                fila_frames.put((frame, cfg, precisa_forcar, t_frame))
+
+        pipeline.encerrar()
+
+    def etapa_preprocessamento(item):
         """
-        Envia a string de texto fornecida em En-US para a API de tradução do Google Translator,
-        que retorna a sua versão traduzida em Pt-BR
+        Estágio de pré-processamento: prepara a imagem do OCR e atualiza a prévia.
         """
-        if texto in cache_traducoes:
-            return cache_traducoes[texto]
-        try:
-            traducao = translator.translate(texto)
-            cache_traducoes[texto] = traducao
-            return traducao
+        frame, cfg, precisa_forcar, t_frame = item
 
-        except Exception as e:
-            print("Erro na tradução:", e)
-            return ""
+        with METRICAS.medir("preprocessamento"):
+            # escala automática: mede a altura das letras uma vez por área de captura
+            escala = escala_auto.obter(frame, cfg) if int(cfg.resize_auto) == 1 else None
 
-    def loop_traducao() -> None:
+            img_proc = preprocessar_imagem(frame, cfg, escala)
+
+            # onde está o texto na captura: decide se as caixas da última detecção ainda servem
+            pegada = pegada_texto(frame)
+
+        with METRICAS.medir("preview"):
+            atualizar_preview(img_proc, cfg)
+
+        return img_proc, cfg, precisa_forcar, pegada, t_frame
+
+    def atualizar_preview(img_proc, cfg) -> None:
         """
-        Loop principal doo APP. Coordena a captura a tela, detecta quando a legenda mudou, faz o OCR,
-        traduz a frase lida e atualiza a variável global que exibirá o texto em tela.
+        Gera a prévia da imagem do OCR só se o painel estiver visível e no máximo PREVIEW_MAX_FPS vezes/s.
         """
-        nonlocal ultima_legenda, frame_anterior, texto_en_atual, texto_pt_atual
+        nonlocal ultimo_preview
 
-        while not stop_event.is_set():
+        if not app.preview_visivel:
+            return
 
-            # se estiver pausado, não roda OCR
-            if pause_event.is_set():
-                print("⏸ Loop pausado")
-                time.sleep(0.1)
-                continue
+        agora = time.monotonic()
+        if agora - ultimo_preview < 1.0 / PREVIEW_MAX_FPS:
+            return
+        ultimo_preview = agora
 
-            cfg = CONFIG.get()
+        # gera preview da imagem que vai pro OCR
+        preview = gerar_preview_ocr(img_proc, cfg)
 
-            frame = capturar_tela(CAPTURE_AREA)
-            if frame is None:
-                time.sleep(UPDATE_INTERVAL)
-                continue
+        # converte para PGM (sem compressão)
+        ppm = cv2_to_ppm_bytes(preview)
 
-            precisa_forcar = force_read_event.is_set()
+        # manda para UI com segurança (Tkinter só no main thread)
+        app.after(0, app.update_preview, ppm)
 
-            if (not precisa_forcar) and frame_anterior is not None and not imagem_mudou(frame, frame_anterior, cfg.diff_threshold):
-                time.sleep(UPDATE_INTERVAL)
-                continue
+    def etapa_ocr(item):
+        """
+        Estágio de OCR. Pede a tradução (assíncrona) somente se a legenda mudou.
+        """
+        nonlocal ultima_legenda, texto_en_atual, versao_cfg_ocr, t_legenda_atual
 
-            frame_anterior = frame.copy()
+        img_proc, cfg, precisa_forcar, pegada, t_frame = item
 
-            force_read_event.clear()
+        # config mudou: só descarta as caixas de detecção se mudou algo que afeta o OCR
+        # (ex.: mexer só no diff_threshold não invalida nada; o cache de OCR já é chaveado pelos campos de OCR)
+        if cfg.versao != versao_cfg_ocr:
+            alterados = CONFIG.campos_alterados(versao_cfg_ocr)
+            if alterados & (set(CAMPOS_OCR) | set(CAMPOS_PREPROCESSAMENTO)):
+                leitor_ocr.invalidar_caixas()
+            versao_cfg_ocr = cfg.versao
 
-            img_proc = preprocessar_imagem(frame, cfg)
+        with METRICAS.medir("ocr"):
+            texto = extrair_texto(img_proc, cfg, pegada=pegada)
 
-            # gera preview da imagem que vai pro OCR
-            preview = gerar_preview_ocr(img_proc, cfg)
+        if texto:
+            texto = texto.replace("|", "I")
+            if int(cfg.resize_auto) == 1:
+                escala_auto.confirmar()  # houve texto: a escala medida passa a valer até a área mudar
 
-            # converte para PNG bytes
-            png = cv2_to_png_bytes(preview)
+        # variação de OCR da mesma legenda (I/l/|, vírgula...) não conta como legenda nova
+        if texto and (precisa_forcar or not mesma_legenda(texto, ultima_legenda)):
+            ultima_legenda = texto
+            texto_en_atual = texto  # EN aparece já; PT chega quando o worker responder
+            t_legenda_atual = t_frame
+            publicar_textos()
+            tradutor.pedir(texto)
 
-            # manda para UI com segurança (Tkinter só no main thread)
-            app.after(0, app.update_preview, png)
+        return None
 
-            # agora roda OCR normal
-            texto = extrair_texto(img_proc, cfg)
+    def on_traducao(texto, traducao):
+        """
+        Chamado pelo worker de tradução. Descarta a resposta se a tela já mostra outra legenda.
+        """
+        nonlocal texto_pt_atual
 
-            if texto:
-                texto = texto.replace("|", "I")
+        if texto != texto_en_atual:
+            return
 
-            if texto and (precisa_forcar or texto != ultima_legenda):
-                ultima_legenda = texto
-                texto_en_atual = texto
+        texto_pt_atual = traducao
+        publicar_textos()
 
-                traducao = traduzir_texto(texto)
-                if traducao:
-                    texto_pt_atual = traducao
+        # da mudança de pixels até a tradução publicada para a tela
+        if t_legenda_atual is not None:
+            METRICAS.registrar("ponta_a_ponta", time.perf_counter() - t_legenda_atual)
 
-            time.sleep(UPDATE_INTERVAL)
+        if prefetcher is not None:
+            prefetcher.agendar(traducao)
 
-    def update_app() -> None:
+    def publicar_textos() -> None:
         """
-        Atualiza labels da janela principal do App conforme as legendas são lidas e armazenadas
+        Envia os textos atuais para a janela principal. Pode ser chamada de qualquer thread:
+        o App só repinta quando recebe algo novo (várias publicações seguidas viram uma só).
         """
-        app.update_texts(texto_en_atual, texto_pt_atual)
-        app.after(500, update_app)
+        app.publicar_textos(texto_en_atual, texto_pt_atual)
 
     def on_texto_editado(texto_editado: str):
-        nonlocal texto_en_atual, texto_pt_atual, ultima_legenda
+        nonlocal texto_en_atual, ultima_legenda, t_legenda_atual
 
         # garante que o sistema esteja rodando
         pause_event.clear()
@@ -232,53 +275,115 @@ def main():
 
         # limpa leitura forçada pendente
         force_read_event.clear()
+        agendador.acordar()
 
         texto_en_atual = texto_editado
+        publicar_textos()
         ultima_legenda = texto_editado
+        # linha digitada não passou pela captura: não entra na latência ponta a ponta
+        t_legenda_atual = None
 
-        traducao = traduzir_texto(texto_editado)
-        if traducao:
-            texto_pt_atual = traducao
+        # não bloqueia o main thread do Tk: a tradução chega via on_traducao
+        tradutor.pedir(texto_editado)
 
     # Constantes
-    UPDATE_INTERVAL = 2
+    POLL_INTERVAL_MIN = 0.1   # polling rápido enquanto a legenda está mudando
+    POLL_INTERVAL_MAX = 1.0   # teto do backoff com a tela parada
+    IDLE_AFTER = 5.0          # segundos sem mudança até começar o backoff
+    OCR_INTERVAL_MIN = 0.3    # espaçamento mínimo entre dois OCRs
     CAPTURE_AREA = None
+    REUSE_BOXES_CONF_MIN = 0.6  # abaixo disso, as caixas reaproveitadas são descartadas e a detecção roda de novo
+    TRANSLATE_DEBOUNCE = 0.15 # janela para juntar legendas que mudam em sequência antes de traduzir
+    PREVIEW_MAX_FPS = 4       # limite de atualizações da prévia do OCR
+    PREFETCH_DEFINITIONS = False  # pré-carrega em segundo plano as definições das palavras traduzidas
+    TRANSLATOR_BACKEND = "google"  # "google" ou "local" (sem rede, para testes/benchmark)
+    TRANSLATION_CACHE_FILE = "traducoes.db"  # cache persistente de traduções (SQLite)
+    METRICS_ENABLED = False   # instrumentação por estágio (também liga/desliga com F3 no App)
+    METRICS_EXPORT_FILE = None  # ex.: "metricas.json" ou "metricas.csv" (exportação periódica)
+    METRICS_EXPORT_INTERVAL = 10.0
+    OCR_CACHE_FILE = None     # ex.: "ocr_cache.json" para reaproveitar o cache de OCR entre sessões
 
     # Variáveis
     ultima_legenda = ""
-    frame_anterior = None
-    cache_traducoes = {}
+    assinatura_anterior = None
+    ultimo_preview = 0.0
+    t_legenda_atual = None  # perf_counter do frame que gerou a legenda atual
+    versao_cfg_ocr = CONFIG.versao
     texto_en_atual = "Aguardando legenda (EN)..."
     texto_pt_atual = "Aguardando tradução (PT)..."
 
     # Instâncias
     app = App(recapturar_area, pausar_ou_retomar, ler_novamente, sair)
     app.registrar_callback_edicao(on_texto_editado)
+    app.protocol("WM_DELETE_WINDOW", sair)
 
     reader = easyocr.Reader(['en'], gpu=False)
-    translator = GoogleTranslator(source='en', target='pt')
+    cache_ocr = CacheOcr(arquivo=OCR_CACHE_FILE)
+    leitor_ocr = LeitorOcr(reader, cache_ocr, reuse_conf_min=REUSE_BOXES_CONF_MIN)
+    escala_auto = EscalaAutomatica()
+    prefetcher = PrefetcherSignificados() if PREFETCH_DEFINITIONS else None
+    translator = criar_tradutor(TRANSLATOR_BACKEND, origem='en', destino='pt')
+    cache_traducoes = CacheTraducao(TRANSLATION_CACHE_FILE, origem='en', destino='pt')
+    servico_traducao = ServicoTraducao(translator, cache_traducoes)
 
     # Eventos
     stop_event = threading.Event()
     force_read_event = threading.Event()
     pause_event = threading.Event()  # quando setado => pausado
 
+    agendador = AgendadorCaptura(
+        stop_event, pause_event,
+        intervalo_min=POLL_INTERVAL_MIN,
+        intervalo_max=POLL_INTERVAL_MAX,
+        ocioso_apos=IDLE_AFTER,
+        intervalo_ocr=OCR_INTERVAL_MIN
+    )
+
+    # Pipeline: captura -> pré-processamento -> OCR (-> tradução assíncrona).
+    # Filas de 1 posição: o item mais novo substitui o antigo, então nenhum estágio acumula atraso.
+    pipeline = Pipeline()
+    fila_frames = pipeline.fila("frames")
+    fila_ocr = pipeline.fila("ocr")
+
+    pipeline.estagio("preprocessamento", fila_frames, etapa_preprocessamento, fila_ocr)
+    pipeline.estagio("ocr", fila_ocr, etapa_ocr)
+
+    # tradução fora do pipeline: worker com debounce que descarta legendas superadas
+    tradutor = TradutorAssincrono(traduzir_texto, on_traducao, debounce=TRANSLATE_DEBOUNCE)
+
+    # Métricas
+    METRICAS.ativar(METRICS_ENABLED)
+    METRICAS.registrar_fonte("cache_ocr", cache_ocr.estatisticas)
+    METRICAS.registrar_fonte("cache_traducao", cache_traducoes.estatisticas)
+    METRICAS.registrar_fonte("filas", pipeline.status)
+    METRICAS.registrar_fonte("tradutor", lambda: {
+        "descartados": tradutor.descartados,
+        "atrasados": tradutor.atrasados,
+    })
+    if METRICS_EXPORT_FILE:
+        METRICAS.iniciar_exportacao(METRICS_EXPORT_FILE, METRICS_EXPORT_INTERVAL)
 
     # Run
-    app.update_texts("Selecione a área das legendas...", "")
-    CAPTURE_AREA = selecionar_area(app)
+    try:
+        app.update_texts("Selecione a área das legendas...", "")
+        CAPTURE_AREA = selecionar_area(app)
+
+        if not CAPTURE_AREA:
+            app.update_texts("Área inválida ou cancelada.\nFechando...", "")
+            app.after(1500, app.destroy)
+            app.mainloop()
+            return
 
-    if not CAPTURE_AREA:
-        app.update_texts("Área inválida ou cancelada.\nFechando...", "")
-        app.after(1500, app.destroy)
-        app.mainloop()
-        return
+        pipeline.iniciar()
+        tradutor.iniciar()
 
-    thread = threading.Thread(target=loop_traducao, daemon=True)
-    thread.start()
+        thread = threading.Thread(target=loop_traducao, daemon=True)
+        thread.start()
 
-    update_app()
-    app.mainloop()
+        publicar_textos()
+        app.mainloop()
+    finally:
+        encerrar()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,217 @@
+import csv
+import json
+import os
+import threading
+import time
+from collections import deque
+
+
+class _MedicaoNula:
+    """
+    Context manager vazio usado quando as métricas estão desligadas (custo desprezível).
+    """
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        return False
+
+
+_NULA = _MedicaoNula()
+
+
+class _Medicao:
+    __slots__ = ("metricas", "nome", "inicio")
+
+    def __init__(self, metricas, nome):
+        self.metricas = metricas
+        self.nome = nome
+
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *_):
+        self.metricas.registrar(self.nome, time.perf_counter() - self.inicio)
+        return False
+
+
+class Metricas:
+    """
+    Latência por estágio (p50/p95/p99 sobre as últimas amostras), contadores e
+    estatísticas de fontes externas (caches, filas), com exportação periódica JSON/CSV.
+
+    Desligada por padrão: medir() devolve um context manager vazio e registrar()/contar()
+    retornam na primeira linha.
+    """
+
+    def __init__(self, amostras: int = 2048):
+        self.ativo = False
+        self.amostras = amostras
+
+        self._lock = threading.Lock()
+        self._tempos: dict[str, deque] = {}
+        self._contagens: dict[str, int] = {}
+        self._contadores: dict[str, int] = {}
+        self._fontes: dict = {}
+        self._inicio = time.monotonic()
+
+        self._exportador = None
+        self._parar_exportacao = threading.Event()
+
+    def ativar(self, ativo: bool = True) -> None:
+        self.ativo = ativo
+
+    # ---------- Coleta ----------
+
+    def medir(self, nome: str):
+        """
+        with METRICAS.medir("ocr"): ...
+        """
+        if not self.ativo:
+            return _NULA
+        return _Medicao(self, nome)
+
+    def registrar(self, nome: str, segundos: float) -> None:
+        if not self.ativo:
+            return
+
+        with self._lock:
+            tempos = self._tempos.get(nome)
+            if tempos is None:
+                tempos = self._tempos[nome] = deque(maxlen=self.amostras)
+            tempos.append(segundos)
+            self._contagens[nome] = self._contagens.get(nome, 0) + 1
+
+    def contar(self, nome: str, n: int = 1) -> None:
+        if not self.ativo:
+            return
+
+        with self._lock:
+            self._contadores[nome] = self._contadores.get(nome, 0) + n
+
+    def registrar_fonte(self, nome: str, funcao) -> None:
+        """
+        Fonte de estatísticas externas (ex.: cache.estatisticas, pipeline.status), lida só no resumo.
+        """
+        self._fontes[nome] = funcao
+
+    def zerar(self) -> None:
+        with self._lock:
+            self._tempos.clear()
+            self._contagens.clear()
+            self._contadores.clear()
+            self._inicio = time.monotonic()
+
+    # ---------- Resumo ----------
+
+    @staticmethod
+    def _percentil(ordenados: list, p: float) -> float:
+        if not ordenados:
+            return 0.0
+        i = min(len(ordenados) - 1, max(0, int(round(p / 100 * (len(ordenados) - 1)))))
+        return ordenados[i]
+
+    def resumo(self) -> dict:
+        with self._lock:
+            tempos = {nome: sorted(valores) for nome, valores in self._tempos.items()}
+            contagens = dict(self._contagens)
+            contadores = dict(self._contadores)
+            duracao = time.monotonic() - self._inicio
+
+        estagios = {}
+        for nome, ordenados in tempos.items():
+            estagios[nome] = {
+                "n": contagens.get(nome, 0),
+                "por_segundo": contagens.get(nome, 0) / duracao if duracao > 0 else 0.0,
+                "p50_ms": self._percentil(ordenados, 50) * 1000,
+                "p95_ms": self._percentil(ordenados, 95) * 1000,
+                "p99_ms": self._percentil(ordenados, 99) * 1000,
+                "max_ms": (ordenados[-1] * 1000) if ordenados else 0.0,
+            }
+
+        fontes = {}
+        for nome, funcao in list(self._fontes.items()):
+            try:
+                fontes[nome] = funcao()
+            except Exception as e:
+                fontes[nome] = {"erro": str(e)}
+
+        return {
+            "timestamp": time.time(),
+            "duracao_s": duracao,
+            "estagios": estagios,
+            "contadores": contadores,
+            "fontes": fontes,
+        }
+
+    def texto_hud(self) -> str:
+        """
+        Resumo curto para o overlay do App.
+        """
+        r = self.resumo()
+        linhas = [f"{'estágio':<16}{'n':>6}{'p50':>8}{'p95':>8}{'p99':>8}"]
+        for nome, e in sorted(r["estagios"].items()):
+            linhas.append(f"{nome:<16}{e['n']:>6}{e['p50_ms']:>8.1f}{e['p95_ms']:>8.1f}{e['p99_ms']:>8.1f}")
+
+        if r["contadores"]:
+            linhas.append("")
+            linhas.extend(f"{nome}: {v}" for nome, v in sorted(r["contadores"].items()))
+
+        for nome, dados in sorted(r["fontes"].items()):
+            if isinstance(dados, dict) and "taxa_acerto" in dados:
+                linhas.append(f"{nome}: {dados['taxa_acerto'] * 100:.0f}% acerto")
+
+        return "\n".join(linhas)
+
+    # ---------- Exportação ----------
+
+    def exportar(self, caminho: str) -> None:
+        """
+        Grava o resumo atual. .csv -> uma linha por estágio (acrescenta); qualquer outro -> JSON.
+        """
+        r = self.resumo()
+
+        if caminho.lower().endswith(".csv"):
+            novo = not os.path.exists(caminho)
+            with open(caminho, "a", newline="", encoding="utf-8") as f:
+                w = csv.writer(f)
+                if novo:
+                    w.writerow(["timestamp", "estagio", "n", "por_segundo", "p50_ms", "p95_ms", "p99_ms", "max_ms"])
+                for nome, e in sorted(r["estagios"].items()):
+                    w.writerow([f"{r['timestamp']:.3f}", nome, e["n"], f"{e['por_segundo']:.3f}",
+                                f"{e['p50_ms']:.3f}", f"{e['p95_ms']:.3f}", f"{e['p99_ms']:.3f}", f"{e['max_ms']:.3f}"])
+            return
+
+        tmp = caminho + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(r, f, ensure_ascii=False, indent=2, default=str)
+        os.replace(tmp, caminho)
+
+    def iniciar_exportacao(self, caminho: str, intervalo: float = 10.0) -> None:
+        """
+        Exporta o resumo a cada `intervalo` segundos numa thread própria.
+        """
+        if self._exportador is not None:
+            return
+
+        def _loop():
+            while not self._parar_exportacao.wait(intervalo):
+                if not self.ativo:
+                    continue
+                try:
+                    self.exportar(caminho)
+                except Exception as e:
+                    print("Erro ao exportar métricas:", e)
+
+        self._exportador = threading.Thread(target=_loop, name="metricas", daemon=True)
+        self._exportador.start()
+
+    def parar_exportacao(self) -> None:
+        self._parar_exportacao.set()
+
+
+# instância global compartilhada
+METRICAS = Metricas()
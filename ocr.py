@@ -0,0 +1,224 @@
+import re
+
+import easyocr
+
+from cache_ocr import CacheOcr
+from metricas import METRICAS
+from opencv import pegada_contida, pegada_mudou
+
+
+class LeitorOcr:
+    """
+    Leitura de legendas com EasyOCR: cache de resultados por conteúdo da imagem,
+    reaproveitamento das caixas de detecção e pós-processamento (linhas + pontuação).
+    Usado pelo app (main.py), pelo benchmark e pelo modo de vídeo offline.
+
+    Não é thread-safe: cada thread de OCR deve ter o seu (o EasyOCR também não é).
+    """
+
+    def __init__(self, reader=None, cache: CacheOcr = None, reuse_conf_min: float = 0.6):
+        self.reader = reader if reader is not None else easyocr.Reader(['en'], gpu=False)
+        self.cache = cache if cache is not None else CacheOcr()
+        self.reuse_conf_min = reuse_conf_min  # abaixo disso, as caixas reaproveitadas são descartadas
+
+        # (horizontal_list, free_list, shape da imagem, pegada, área das caixas) da última detecção
+        self._caixas = None
+
+        self.deteccoes = 0        # CRAFT completo
+        self.reconhecimentos = 0  # chamadas de recognize (com ou sem detecção)
+
+    def invalidar_caixas(self) -> None:
+        """
+        Força a próxima leitura a rodar a detecção completa (ex.: área ou config mudaram).
+        """
+        self._caixas = None
+
+    def extrair_texto(self, img, cfg, conf_min=0.40, pegada=None) -> str:
+        """
+        Identifica e extrai o texto (En-US) na imagem
+        """
+        texto, _conf = self.extrair_texto_com_confianca(img, cfg, conf_min, pegada)
+        return texto
+
+    def extrair_texto_com_confianca(self, img, cfg, conf_min=0.40, pegada=None) -> tuple[str, float]:
+        """
+        Igual a extrair_texto, mas retorna também a confiança média das caixas aceitas.
+        Consulta o cache de OCR antes de chamar o EasyOCR.
+        """
+        chave = self.cache.chave(img, cfg, conf_min)
+        em_cache = self.cache.get(chave)
+        if em_cache is not None:
+            return em_cache
+
+        texto, conf = self._ler_ocr(img, cfg, conf_min, pegada)
+        self.cache.put(chave, texto, conf)
+        return texto, conf
+
+    def _executar_easyocr(self, img, cfg, pegada) -> list:
+        """
+        Detecção (CRAFT) + reconhecimento. Se o layout da legenda não mudou (mesma pegada de texto),
+        reaproveita as caixas da última detecção e roda só o reconhecimento, que é bem mais barato.
+        Só reaproveita se a pegada atual couber nas caixas (senão a linha nova seria cortada).
+        A detecção completa volta a rodar quando a pegada muda, some ou a confiança cai.
+        """
+        if self._caixas is not None:
+            horizontal, livres, shape_anterior, pegada_anterior, area_caixas = self._caixas
+
+            if (shape_anterior == img.shape and not pegada_mudou(pegada, pegada_anterior)
+                    and pegada_contida(pegada, area_caixas)):
+                self.reconhecimentos += 1
+                resultado = self.reader.recognize(
+                    img,
+                    horizontal_list=horizontal,
+                    free_list=livres,
+                    detail=1,
+                    paragraph=False
+                )
+
+                confs = [float(item[2]) for item in resultado if len(item) == 3]
+                if confs and sum(confs) / len(confs) >= self.reuse_conf_min:
+                    return resultado
+
+        self.deteccoes += 1
+        horizontal, livres = self.reader.detect(
+            img,
+            text_threshold=cfg.text_threshold,
+            low_text=cfg.low_text,
+            link_threshold=cfg.link_threshold
+        )
+        horizontal, livres = horizontal[0], livres[0]
+
+        # sem pegada (máscara não vê esta legenda) não há como validar o reaproveitamento depois
+        if (horizontal or livres) and pegada is not None:
+            self._caixas = (horizontal, livres, img.shape, pegada, area_das_caixas(horizontal, livres, img.shape))
+        else:
+            self._caixas = None
+
+        self.reconhecimentos += 1
+        return self.reader.recognize(
+            img,
+            horizontal_list=horizontal,
+            free_list=livres,
+            detail=1,
+            paragraph=False
+        )
+
+    def _ler_ocr(self, img, cfg, conf_min, pegada=None) -> tuple[str, float]:
+        with METRICAS.medir("easyocr"):
+            resultado = self._executar_easyocr(img, cfg, pegada)
+
+        caixas_validas = []
+        confiancas = []
+
+        for item in resultado:
+            # Formatos possíveis:
+            # 1) (bbox, texto, conf)
+            # 2) (bbox, texto)
+            if len(item) == 3:
+                bbox, texto, conf = item
+            elif len(item) == 2:
+                bbox, texto = item
+                conf = 1.0  # sem score -> assume confiança alta (ou você pode ignorar)
+            else:
+                continue
+
+            if not texto:
+                continue
+
+            # conf pode vir como string em alguns casos -> força float
+            try:
+                conf = float(conf)
+            except Exception:
+                conf = 0.0
+
+            if conf < conf_min:
+                continue
+
+            texto = texto.strip()
+            texto = re.sub(r"\s+", " ", texto)
+
+            # ignora lixo: só símbolos ou muito curto
+            if len(texto) < 2:
+                continue
+            if re.fullmatch(r"[\W_]+", texto):
+                continue
+
+            caixas_validas.append((bbox, texto))
+            confiancas.append(conf)
+
+        # uma linha de legenda por linha de texto (limpar_pontuacao colapsa espaços, então é por linha)
+        linhas = [limpar_pontuacao(" ".join(textos)) for textos in agrupar_linhas(caixas_validas)]
+        texto_final = "\n".join(l for l in linhas if l).strip()
+        conf_media = sum(confiancas) / len(confiancas) if confiancas else 0.0
+        return texto_final, conf_media
+
+
+def area_das_caixas(horizontal, livres, shape):
+    """
+    Retângulo (x0, y0, x1, y1), normalizado em 0..1 como pegada_texto, que envolve as caixas
+    de detecção do EasyOCR (horizontal_list: [x_min, x_max, y_min, y_max]; free_list: 4 pontos).
+    """
+    xs, ys = [], []
+    for x_min, x_max, y_min, y_max in horizontal:
+        xs += [x_min, x_max]
+        ys += [y_min, y_max]
+    for pontos in livres:
+        xs += [p[0] for p in pontos]
+        ys += [p[1] for p in pontos]
+
+    if not xs:
+        return None
+
+    altura, largura = shape[:2]
+    return (min(xs) / largura, min(ys) / altura, max(xs) / largura, max(ys) / altura)
+
+
+def agrupar_linhas(caixas) -> list[list[str]]:
+    """
+    Agrupa as caixas do OCR em linhas, pela geometria: caixas cujo centro vertical fica a
+    menos de meia altura da linha atual pertencem a ela. Dentro da linha, ordena da esquerda
+    para a direita. Retorna os textos de cada linha, de cima para baixo.
+    """
+    itens = []
+    for bbox, texto in caixas:
+        try:
+            xs = [float(p[0]) for p in bbox]
+            ys = [float(p[1]) for p in bbox]
+        except Exception:
+            xs, ys = [0.0], [0.0]
+        itens.append((sum(ys) / len(ys), max(ys) - min(ys), min(xs), texto))
+
+    itens.sort(key=lambda i: i[0])
+
+    linhas = []  # [centro_y, altura, [(x, texto)]]
+    for centro, altura, x, texto in itens:
+        if linhas and abs(centro - linhas[-1][0]) <= max(altura, linhas[-1][1]) / 2:
+            linhas[-1][2].append((x, texto))
+        else:
+            linhas.append([centro, altura, [(x, texto)]])
+
+    return [[t for _, t in sorted(palavras, key=lambda p: p[0])] for _, _, palavras in linhas]
+
+
+def limpar_pontuacao(texto: str) -> str:
+    """
+    Realiza pós processamento do texto para aprimor caracteres de pontuação
+    """
+    texto = texto.strip()
+
+    # remove espaços antes de pontuação: "hello ," -> "hello,"
+    texto = re.sub(r"\s+([,.;:!?])", r"\1", texto)
+
+    # garante espaço depois de pontuação quando necessário: "hello,world" -> "hello, world"
+    texto = re.sub(r"([,.;:!?])([A-Za-z])", r"\1 \2", texto)
+
+    # junta reticências quebradas: ". . ." -> "..."
+    texto = re.sub(r"\.\s*\.\s*\.", "...", texto)
+
+    # junta dois pontos " .. " -> "..."
+    texto = re.sub(r"\.\.", "...", texto)
+
+    # remove múltiplos espaços
+    texto = re.sub(r"\s+", " ", texto)
+
+    return texto
@@ -1,14 +1,18 @@
 import numpy as np
 import cv2
 import mss
-from dataclasses import dataclass
+from dataclasses import dataclass, field, fields, replace
+from collections import deque
 import threading
+import os
+import sys
 
-@dataclass
+@dataclass(frozen=True)
 class OcrConfig:
     # Preprocessamento
     resize_fx: float = 3.0
     resize_fy: float = 3.0
+    resize_auto: int = 1  # 0/1: escolhe a escala pela altura medida das letras (resize_fx/fy viram o teto)
     clahe_clip: float = 2.0
     sharpen_strength: float = 1.0  # 0 = desliga, 1 = padrão
 
@@ -17,67 +21,256 @@ class OcrConfig:
     preview_invert: int = 0     # 0/1
 
     # Detector de mudança
-    diff_threshold: float = 2.0
+    diff_threshold: float = 0.5  # % dos pixels da assinatura que precisam mudar (ver imagem_mudou)
+    diff_mascara_texto: int = 0  # 0/1: compara só pixels com cara de legenda (ignora o vídeo ao fundo)
 
     # OCR (EasyOCR)
     text_threshold: float = 0.6
     low_text: float = 0.3
     link_threshold: float = 0.4
 
+    # versão do snapshot no ConfigStore (-1 = config criada fora do store)
+    versao: int = field(default=-1, compare=False)
+
+# campos que alteram os objetos derivados do pré-processamento (CLAHE, kernel, resize)
+CAMPOS_PREPROCESSAMENTO = ("resize_fx", "resize_fy", "resize_auto", "clahe_clip", "sharpen_strength")
+
 class ConfigStore:
     """
     Armazena a config de forma segura entre threads.
     Menu escreve, thread OCR lê.
+
+    Cada update gera um novo snapshot imutável (OcrConfig congelado) com número de versão.
+    A leitura (get) não usa lock: é só a leitura de uma referência.
     """
-    def __init__(self):
+    def __init__(self, historico: int = 64):
         self._lock = threading.Lock()
-        self._cfg = OcrConfig()
+        self._cfg = OcrConfig(versao=0)
+        self._alteracoes = deque(maxlen=historico)  # (versao, campos alterados)
 
     def get(self) -> OcrConfig:
-        with self._lock:
-            return OcrConfig(**self._cfg.__dict__)  # cópia
+        return self._cfg  # imutável: não precisa de cópia nem de lock
+
+    @property
+    def versao(self) -> int:
+        return self._cfg.versao
 
     def update(self, **kwargs):
         with self._lock:
-            for k, v in kwargs.items():
-                if hasattr(self._cfg, k):
-                    setattr(self._cfg, k, v)
+            atual = self._cfg
+            novos = {
+                k: v for k, v in kwargs.items()
+                if hasattr(atual, k) and k != "versao" and getattr(atual, k) != v
+            }
+            if not novos:
+                return
+
+            self._cfg = replace(atual, versao=atual.versao + 1, **novos)
+            self._alteracoes.append((self._cfg.versao, frozenset(novos)))
+
+    def campos_alterados(self, desde_versao: int) -> frozenset:
+        """
+        Campos alterados depois de desde_versao. Se o histórico já não cobre essa versão,
+        retorna todos os campos (o chamador deve invalidar tudo).
+        """
+        with self._lock:
+            versao_atual = self._cfg.versao
+            if desde_versao >= versao_atual:
+                return frozenset()
+
+            if not self._alteracoes or self._alteracoes[0][0] > desde_versao + 1:
+                return frozenset(f.name for f in fields(OcrConfig) if f.name != "versao")
+
+            campos = set()
+            for versao, alterados in self._alteracoes:
+                if versao > desde_versao:
+                    campos |= alterados
+            return frozenset(campos)
 
 # instância global compartilhada
 CONFIG = ConfigStore()
 
-def preprocessar_imagem(img, cfg: OcrConfig = None) -> cv2.typing.MatLike:
+# Máscara de texto (detector de mudança): legenda típica = letra clara, pouco saturada, com contorno escuro
+MASCARA_V_MIN = 170        # brilho mínimo do glifo
+MASCARA_S_MAX = 60         # saturação máxima do glifo (branco/cinza)
+MASCARA_V_CONTORNO = 90    # brilho máximo do contorno/sombra
+MASCARA_LARGURA = 320      # resolução de trabalho da máscara
+KERNEL_CONTORNO = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (5, 5))
+KERNEL_RUIDO = np.ones((2, 2), np.uint8)
+
+# Detector de mudança: diferença mínima (0..255) para um pixel da assinatura contar como mudado.
+# Acima do ruído de compressão/captura, que a média da miniatura já reduz a 1-2 níveis.
+DIFF_PIXEL_MIN = 8
+
+# objetos derivados da config (CLAHE, kernel...), um conjunto por thread (CLAHE não é thread-safe)
+_derivados_local = threading.local()
+
+def _derivados_preprocessamento(cfg: OcrConfig) -> dict:
+    """
+    Retorna os objetos derivados da config usados no pré-processamento, reaproveitando-os
+    enquanto a versão da config não mudar. Se a versão mudou mas os campos relevantes são
+    os mesmos (ex.: só diff_threshold), os objetos continuam valendo.
+    """
+    cache = getattr(_derivados_local, "cache", None)
+
+    if cache is not None and cfg.versao >= 0 and cache["versao"] == cfg.versao:
+        return cache
+
+    valores = tuple(getattr(cfg, c) for c in CAMPOS_PREPROCESSAMENTO)
+    if cache is not None and cache["valores"] == valores:
+        cache["versao"] = cfg.versao
+        return cache
+
+    kernel = None
+    if cfg.sharpen_strength > 0:
+        s = float(cfg.sharpen_strength)
+        kernel = np.array([[0, -1, 0],
+                           [-1, 4 + s, -1],
+                           [0, -1, 0]])
+
+    cache = {
+        "versao": cfg.versao,
+        "valores": valores,
+        "fx": max(1.0, float(cfg.resize_fx)),
+        "fy": max(1.0, float(cfg.resize_fy)),
+        "clahe": cv2.createCLAHE(
+            clipLimit=max(0.1, float(cfg.clahe_clip)),
+            tileGridSize=(8, 8)
+        ),
+        "kernel": kernel,
+    }
+    _derivados_local.cache = cache
+    return cache
+
+# Escala automática: altura de glifo em que o EasyOCR trabalha bem (px, depois do resize)
+ALTURA_GLIFO_ALVO = 32
+PASSO_ESCALA = 0.5  # arredonda a escala para não oscilar entre frames
+
+def estimar_altura_glifos(img) -> float:
+    """
+    Estima a altura típica das letras na captura (px), pela mediana da altura dos
+    componentes conexos após binarização (Otsu). Mede só na faixa onde mascara_texto achou
+    pixels de legenda (pegada_texto), para o vídeo atrás da legenda não entrar na medida.
+    Retorna 0 se não achar nada parecido com texto.
+    """
+    if img is None:
+        return 0.0
+
+    pegada = pegada_texto(img)
+    if pegada is None:
+        return 0.0
+
+    # recorta a faixa do texto com folga de meia altura em cima e embaixo
+    h_img, w_img = img.shape[:2]
+    x0, y0, x1, y1 = pegada
+    folga = (y1 - y0) / 2
+    recorte = img[
+        int(max(0.0, y0 - folga) * h_img):int(np.ceil(min(1.0, y1 + folga) * h_img)),
+        int(x0 * w_img):int(np.ceil(x1 * w_img))
+    ]
+    if recorte.size == 0:
+        return 0.0
+
+    if len(recorte.shape) == 3:
+        codigo = cv2.COLOR_BGRA2GRAY if recorte.shape[2] == 4 else cv2.COLOR_BGR2GRAY
+        gray = cv2.cvtColor(recorte, codigo)
+    else:
+        gray = recorte
+
+    # a máscara só aceita letras claras: o lado claro do Otsu é o texto
+    _, binaria = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+
+    n, _, stats, _ = cv2.connectedComponentsWithStats(binaria, connectivity=8)
+    if n <= 1:
+        return 0.0
+
+    altura_img = gray.shape[0]
+    w = stats[1:, cv2.CC_STAT_WIDTH]
+    h = stats[1:, cv2.CC_STAT_HEIGHT]
+    area = stats[1:, cv2.CC_STAT_AREA]
+
+    # formato de letra: nem ponto de ruído, nem faixa do tamanho da captura
+    letras = (h >= 4) & (h < altura_img * 0.9) & (w < h * 3) & (area >= 8)
+    if not np.any(letras):
+        return 0.0
+
+    return float(np.median(h[letras]))
+
+class EscalaAutomatica:
+    """
+    Escala escolhida pela altura dos glifos. Enquanto não há confirmação, mede de novo a cada frame;
+    a escala só fica fixa (até resetar(), quando a área de captura muda) depois que o OCR leu
+    texto num frame medido com ela (confirmar()). Assim um primeiro frame sem legenda não decide
+    a escala da sessão inteira. A escala é limitada por resize_fx/resize_fy da config (teto).
+    """
+    def __init__(self, alvo: float = ALTURA_GLIFO_ALVO):
+        self.alvo = alvo
+        self._escala = None      # confirmada
+        self._provisoria = None  # última medida, ainda sem OCR confirmando
+
+    def resetar(self) -> None:
+        self._escala = None
+        self._provisoria = None
+
+    def confirmar(self) -> None:
+        """
+        Chamado quando o OCR devolveu texto: fixa a última escala medida.
+        """
+        if self._escala is None and self._provisoria is not None:
+            self._escala = self._provisoria
+
+    def obter(self, img, cfg: OcrConfig):
+        """
+        Retorna (fx, fy) a usar no pré-processamento.
+        """
+        teto_x = max(1.0, float(cfg.resize_fx))
+        teto_y = max(1.0, float(cfg.resize_fy))
+
+        escala = self._escala
+        if escala is None:
+            altura = estimar_altura_glifos(img)
+            if altura <= 0:
+                # sem texto para medir: usa o teto
+                return teto_x, teto_y
+
+            escala = max(1.0, float(np.ceil(self.alvo / altura / PASSO_ESCALA) * PASSO_ESCALA))
+            self._provisoria = escala
+
+        return min(escala, teto_x), min(escala, teto_y)
+
+def preprocessar_imagem(img, cfg: OcrConfig = None, escala=None) -> cv2.typing.MatLike:
     """
     Aplica técnicas de melhoria de imagem para facilitar a identificação de caracteres pelo OCR.
     Retorna imagem em escala de cinza (1 canal).
+    escala: (fx, fy) opcional que substitui resize_fx/resize_fy (ex.: EscalaAutomatica).
     """
     if cfg is None:
         cfg = CONFIG.get()
 
-    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    if len(img.shape) == 3 and img.shape[2] == 4:
+        gray = cv2.cvtColor(img, cv2.COLOR_BGRA2GRAY)
+    else:
+        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+
+    derivados = _derivados_preprocessamento(cfg)
+
+    fx, fy = escala if escala is not None else (derivados["fx"], derivados["fy"])
 
     # resize controlável
-    gray = cv2.resize(
-        gray, None,
-        fx=max(1.0, float(cfg.resize_fx)),
-        fy=max(1.0, float(cfg.resize_fy)),
-        interpolation=cv2.INTER_CUBIC
-    )
+    if fx != 1.0 or fy != 1.0:
+        gray = cv2.resize(
+            gray, None,
+            fx=fx,
+            fy=fy,
+            interpolation=cv2.INTER_CUBIC
+        )
 
     # clahe controlável
-    clahe = cv2.createCLAHE(
-        clipLimit=max(0.1, float(cfg.clahe_clip)),
-        tileGridSize=(8, 8)
-    )
-    gray = clahe.apply(gray)
+    gray = derivados["clahe"].apply(gray)
 
     # sharpen controlável
-    if cfg.sharpen_strength > 0:
-        s = float(cfg.sharpen_strength)
-        kernel = np.array([[0, -1, 0],
-                           [-1, 4 + s, -1],
-                           [0, -1, 0]])
-        gray = cv2.filter2D(gray, -1, kernel)
+    if derivados["kernel"] is not None:
+        gray = cv2.filter2D(gray, -1, derivados["kernel"])
 
     return gray
 
@@ -90,11 +283,24 @@ def gerar_preview_ocr(img_proc, cfg: OcrConfig = None,
     if img_proc is None:
         return None
 
-    preview = img_proc.copy()
+    preview = img_proc
 
     if len(preview.shape) == 3:
         preview = cv2.cvtColor(preview, cv2.COLOR_BGR2GRAY)
 
+    # reduz antes de binarizar: o threshold roda na imagem pequena, não na ampliada do OCR
+    h, w = preview.shape[:2]
+    scale = min(max_w / w, max_h / h, 1.0)
+
+    if scale != 1.0:
+        preview = cv2.resize(
+            preview,
+            (max(1, int(w * scale)), max(1, int(h * scale))),
+            interpolation=cv2.INTER_AREA
+        )
+    elif preview is img_proc:
+        preview = preview.copy()
+
     if int(cfg.preview_threshold) == 1:
         preview = cv2.adaptiveThreshold(
             preview, 255,
@@ -106,56 +312,279 @@ def gerar_preview_ocr(img_proc, cfg: OcrConfig = None,
     if int(cfg.preview_invert) == 1:
         preview = cv2.bitwise_not(preview)
 
-    h, w = preview.shape[:2]
-    scale = min(max_w / w, max_h / h, 1.0)
-
-    if scale != 1.0:
-        preview = cv2.resize(
-            preview,
-            (int(w * scale), int(h * scale)),
-            interpolation=cv2.INTER_AREA
-        )
-
     return preview
 
-def cv2_to_png_bytes(img: cv2.typing.MatLike) -> bytes:
+def cv2_to_ppm_bytes(img: cv2.typing.MatLike) -> bytes:
     """
-    Converte uma imagem OpenCV (grayscale ou BGR) para PNG em bytes.
-    Isso permite exibir no Tkinter usando PhotoImage(data=...),
-    sem depender de Pillow.
+    Converte uma imagem OpenCV para PGM (grayscale) ou PPM (BGR) binário, sem compressão.
+    O Tk lê esses formatos direto em PhotoImage(data=...), sem o custo de zlib do PNG.
     """
     if img is None:
         return b""
 
-    # se for grayscale, mantém; se for BGR, converte para RGB
     if len(img.shape) == 2:
-        img_out = img
-    else:
-        img_out = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+        h, w = img.shape
+        cabecalho = f"P5\n{w} {h}\n255\n".encode("ascii")
+        return cabecalho + np.ascontiguousarray(img).tobytes()
 
-    ok, buffer = cv2.imencode(".png", img_out)
-    if not ok:
-        return b""
+    h, w = img.shape[:2]
+    rgb = cv2.cvtColor(img, cv2.COLOR_BGRA2RGB if img.shape[2] == 4 else cv2.COLOR_BGR2RGB)
+    cabecalho = f"P6\n{w} {h}\n255\n".encode("ascii")
+    return cabecalho + rgb.tobytes()
+
+def mascara_texto(img, largura: int = MASCARA_LARGURA) -> cv2.typing.MatLike:
+    """
+    Isola os pixels que provavelmente pertencem aos glifos da legenda: claros, pouco saturados
+    e próximos de um contorno escuro. Movimento do vídeo atrás da legenda quase não altera a máscara.
+    Retorna imagem 1 canal (0/255) numa resolução reduzida.
+    """
+    h, w = img.shape[:2]
+    largura = max(1, min(largura, w))
+    altura = max(1, int(round(largura * h / w)))
+
+    small = cv2.resize(img, (largura, altura), interpolation=cv2.INTER_AREA)
+    if small.shape[2] == 4:
+        small = cv2.cvtColor(small, cv2.COLOR_BGRA2BGR)
+
+    hsv = cv2.cvtColor(small, cv2.COLOR_BGR2HSV)
+
+    claro = cv2.inRange(hsv, (0, 0, MASCARA_V_MIN), (180, MASCARA_S_MAX, 255))
+    escuro = cv2.inRange(hsv[:, :, 2], 0, MASCARA_V_CONTORNO)
+
+    # só mantém pixels claros que tenham contorno escuro por perto
+    contorno = cv2.dilate(escuro, KERNEL_CONTORNO)
+    return cv2.bitwise_and(claro, contorno)
+
+def pegada_texto(img, largura: int = MASCARA_LARGURA):
+    """
+    Retângulo (x0, y0, x1, y1), normalizado em 0..1, que envolve os pixels de texto da
+    mascara_texto. Usado para saber se o layout da legenda mudou de lugar/tamanho.
+    Retorna None se não houver pixels de texto.
+    """
+    if img is None:
+        return None
+
+    mascara = mascara_texto(img, largura)
+    # remove pontos isolados do fundo para não inflar o retângulo
+    mascara = cv2.morphologyEx(mascara, cv2.MORPH_OPEN, KERNEL_RUIDO)
+
+    pontos = cv2.findNonZero(mascara)
+    if pontos is None:
+        return None
+
+    x, y, w, h = cv2.boundingRect(pontos)
+    altura, largura = mascara.shape[:2]
+    return (x / largura, y / altura, (x + w) / largura, (y + h) / altura)
+
+def pegada_mudou(p1, p2, tolerancia: float = 0.01) -> bool:
+    """
+    Compara duas pegadas (pegada_texto). Tolerância em fração da largura/altura da captura.
+    Pegada ausente (máscara sem pixels de texto) conta sempre como mudança: sem ela não há
+    como saber se o layout é o mesmo.
+    """
+    if p1 is None or p2 is None:
+        return True
+
+    return max(abs(a - b) for a, b in zip(p1, p2)) > tolerancia
+
+def pegada_contida(pegada, area, margem: float = 0.005) -> bool:
+    """
+    True se a pegada (x0, y0, x1, y1 normalizados) cabe dentro de area (mesmo formato), com uma folga.
+    """
+    if pegada is None or area is None:
+        return False
+
+    x0, y0, x1, y1 = pegada
+    ax0, ay0, ax1, ay1 = area
+    return x0 >= ax0 - margem and y0 >= ay0 - margem and x1 <= ax1 + margem and y1 <= ay1 + margem
+
+def assinatura_imagem(img, largura: int = 96, usar_mascara_texto: bool = False) -> cv2.typing.MatLike:
+    """
+    Gera uma "impressão digital" barata do frame: miniatura em escala de cinza
+    (largura fixa, altura proporcional). Serve para o detector de mudança guardar só
+    alguns bytes entre ticks, em vez do frame inteiro.
+    Com usar_mascara_texto=True, a miniatura é feita sobre mascara_texto(img).
+    """
+    if img is None:
+        return None
+
+    if usar_mascara_texto:
+        img = mascara_texto(img)
+
+    h, w = img.shape[:2]
+    largura = max(1, min(largura, w))
+    altura = int(round(largura * h / w))
+    altura = max(4, min(altura, h, largura))
+
+    # INTER_AREA faz a média dos pixels: equivale a um passa-baixa, o que também filtra ruído
+    thumb = cv2.resize(img, (largura, altura), interpolation=cv2.INTER_AREA)
 
-    return buffer.tobytes()
+    if len(thumb.shape) == 3:
+        codigo = cv2.COLOR_BGRA2GRAY if thumb.shape[2] == 4 else cv2.COLOR_BGR2GRAY
+        thumb = cv2.cvtColor(thumb, codigo)
+
+    return thumb
 
 def imagem_mudou(img1, img2, DIFF_THRESHOLD) -> bool:
     """
-    Verifica se houve alteração entre duas imagens passadas por parâmetro,
-    considerando a DIFF_THRESHOLD passada como argumento
+    Verifica se houve alteração entre duas assinaturas (assinatura_imagem): mudou se mais de
+    DIFF_THRESHOLD % dos pixels diferem em mais de DIFF_PIXEL_MIN níveis.
+    A média da diferença não serve aqui: na miniatura ela é diluída pelos pixels parados
+    (uma legenda trocada inteira cai pela metade), já a fração de pixels mudados quase não
+    depende do tamanho da miniatura.
     """
+    if img1.shape != img2.shape:
+        return True
+
     diff = cv2.absdiff(img1, img2)
-    return np.mean(diff) > DIFF_THRESHOLD
+    mudados = np.count_nonzero(diff > DIFF_PIXEL_MIN)
+    return 100.0 * mudados / diff.size > DIFF_THRESHOLD
 
-def capturar_tela(capture_area) -> cv2.typing.MatLike:
+class CapturadorTela:
     """
-    Através da utilização da biblioteca mss (Multiple ScreenShot), captura uma seção da tela
-    em formato BGRA (4 canais) e posteriormente converte a imagem OpenCV BGR (3 canais)
+    Captura de tela persistente. Mantém uma única sessão mss aberta durante toda a execução,
+    em vez de abrir/fechar uma a cada frame.
+
+    O frame devolvido é uma view BGRA (4 canais) sobre o buffer da captura, sem cópia.
+    O mss (>= 10.2) entrega um bytearray novo a cada grab, então o frame pode ser guardado
+    ou passado para outra thread sem .copy().
+
+    A sessão mss deve ser criada e usada na mesma thread (no Windows e no X11 o contexto
+    é por thread), por isso o objeto deve pertencer à thread de captura.
     """
-    if capture_area is None:
-        return None
+    def __init__(self, capture_area=None):
+        self._sct = None
+        self._status_verificado = False
+        self._area = None
+        self.definir_area(capture_area)
+
+    def definir_area(self, capture_area) -> None:
+        """
+        Atualiza a área de captura. Se a área mudou, a sessão é recriada na próxima captura.
+        """
+        area = dict(capture_area) if capture_area else None
+        if area == self._area:
+            return
+
+        self._area = area
+        self.fechar()
+
+    def _abrir_sessao(self):
+        # No X11 pede explicitamente o backend XShmGetImage (mss >= 10.2): lê a imagem por
+        # memória compartilhada (MIT-SHM) e, se o servidor não oferecer a extensão (X remoto,
+        # alguns Xvfb), o próprio mss cai para XGetImage. Nos outros sistemas, backend padrão.
+        if sys.platform.startswith("linux"):
+            self._sct = mss.MSS(backend="xshmgetimage")
+        else:
+            self._sct = mss.MSS()
+        self._status_verificado = False
+        return self._sct
+
+    def _verificar_status(self) -> None:
+        """
+        Avisa uma vez por sessão se o backend teve que cair para um modo mais lento
+        (ex.: MIT-SHM indisponível no servidor X). O mss só preenche o status depois do primeiro grab.
+        """
+        self._status_verificado = True
+        for nota in self._sct.performance_status:
+            print("Aviso na captura de tela:", nota)
+
+    def capturar(self, capture_area=None) -> cv2.typing.MatLike:
+        """
+        Captura a área atual e retorna uma view BGRA (altura x largura x 4) sem cópia.
+        Se capture_area for passada, ela substitui a área atual (recriando a sessão se mudou).
+        """
+        if capture_area is not None:
+            self.definir_area(capture_area)
+
+        if self._area is None:
+            return None
+
+        sct = self._sct or self._abrir_sessao()
+
+        try:
+            shot = sct.grab(self._area)
+        except Exception as e:
+            print("Erro na captura de tela:", e)
+            self.fechar()
+            return None
+
+        if not self._status_verificado:
+            self._verificar_status()
+
+        # view direta sobre os bytes BGRA do mss (sem np.array/cvtColor por frame)
+        buf = np.frombuffer(shot.raw, dtype=np.uint8)
+        return buf.reshape(shot.height, shot.width, 4)
+
+    def fechar(self) -> None:
+        if self._sct is not None:
+            try:
+                self._sct.close()
+            except Exception:
+                pass
+            self._sct = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.fechar()
+
+
+EXTENSOES_IMAGEM = (".png", ".jpg", ".jpeg", ".bmp", ".webp")
+
+
+def ler_area(texto: str) -> dict:
+    """
+    Converte "x,y,largura,altura" (linha de comando) para o formato de CAPTURE_AREA (left/top/width/height).
+    """
+    x, y, w, h = (int(v) for v in texto.split(","))
+    return {"left": x, "top": y, "width": w, "height": h}
 
-    with mss.mss() as sct:
-        img = np.array(sct.grab(capture_area))
-        return cv2.cvtColor(img, cv2.COLOR_BGRA2BGR)
 
+def recortar_area(img, area):
+    """
+    Recorta do frame a área no formato de CAPTURE_AREA (left/top/width/height). area=None -> frame inteiro.
+    """
+    if not area:
+        return img
+    x, y = area["left"], area["top"]
+    return img[y:y + area["height"], x:x + area["width"]]
+
+
+def ler_frames_gravados(origem: str, fps: float = 10.0, area=None):
+    """
+    Lê uma gravação (arquivo de vídeo ou pasta de imagens em ordem alfabética) no lugar da captura
+    de tela. Gera (tempo em segundos na mídia, frame BGR), amostrando no máximo `fps` frames por segundo.
+    area: mesmo formato de CAPTURE_AREA (left/top/width/height), relativo ao frame.
+    """
+    if os.path.isdir(origem):
+        arquivos = sorted(a for a in os.listdir(origem) if a.lower().endswith(EXTENSOES_IMAGEM))
+        for i, nome in enumerate(arquivos):
+            img = cv2.imread(os.path.join(origem, nome), cv2.IMREAD_COLOR)
+            if img is None:
+                print("Erro ao ler imagem:", nome)
+                continue
+            yield i / fps, recortar_area(img, area)
+        return
+
+    cap = cv2.VideoCapture(origem)
+    if not cap.isOpened():
+        raise IOError(f"Não foi possível abrir o vídeo: {origem}")
+
+    fps_video = cap.get(cv2.CAP_PROP_FPS) or fps
+    passo = max(1, int(round(fps_video / fps)))
+
+    try:
+        i = 0
+        while True:
+            # grab() só avança o decodificador; retrieve() decodifica apenas os frames usados
+            if not cap.grab():
+                break
+            if i % passo == 0:
+                ok, img = cap.retrieve()
+                if ok:
+                    yield i / fps_video, recortar_area(img, area)
+            i += 1
+    finally:
+        cap.release()
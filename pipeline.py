@@ -0,0 +1,136 @@
+import threading
+from collections import deque
+
+
+class FilaUltimo:
+    """
+    Fila limitada entre estágios do pipeline, onde o item mais novo vence.
+    Quando cheia, descarta o item mais antigo (frame velho) em vez de bloquear quem produz.
+    Assim um estágio lento nunca acumula atraso: ele sempre pega o dado mais recente.
+    """
+
+    def __init__(self, nome: str, capacidade: int = 1):
+        self.nome = nome
+        self._itens = deque(maxlen=max(1, capacidade))
+        self._cond = threading.Condition()
+        self._fechada = False
+
+        self.recebidos = 0
+        self.descartados = 0
+
+    def put(self, item) -> None:
+        with self._cond:
+            if self._fechada:
+                return
+
+            if len(self._itens) == self._itens.maxlen:
+                self.descartados += 1
+
+            self._itens.append(item)  # deque com maxlen já remove o mais antigo
+            self.recebidos += 1
+            self._cond.notify()
+
+    def get(self, timeout: float = None):
+        """
+        Bloqueia até haver item. Retorna None se a fila foi fechada ou o timeout estourou.
+        """
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._itens or self._fechada, timeout):
+                return None
+
+            if not self._itens:
+                return None
+
+            return self._itens.popleft()
+
+    def limpar(self) -> None:
+        with self._cond:
+            self._itens.clear()
+
+    def fechar(self) -> None:
+        with self._cond:
+            self._fechada = True
+            self._itens.clear()
+            self._cond.notify_all()
+
+    @property
+    def fechada(self) -> bool:
+        return self._fechada
+
+    def profundidade(self) -> int:
+        with self._cond:
+            return len(self._itens)
+
+
+class Estagio(threading.Thread):
+    """
+    Um estágio do pipeline: consome da fila de entrada, aplica a função e publica o resultado
+    (se não for None) na fila de saída. Cada estágio roda na sua própria thread.
+    """
+
+    def __init__(self, nome: str, entrada: FilaUltimo, funcao, saida: FilaUltimo = None):
+        super().__init__(name=nome, daemon=True)
+        self.nome = nome
+        self.entrada = entrada
+        self.funcao = funcao
+        self.saida = saida
+
+        self.processados = 0
+
+    def run(self) -> None:
+        while not self.entrada.fechada:
+            item = self.entrada.get()
+            if item is None:
+                continue
+
+            try:
+                resultado = self.funcao(item)
+            except Exception as e:
+                print(f"Erro no estágio {self.nome}:", e)
+                continue
+
+            self.processados += 1
+
+            if resultado is not None and self.saida is not None:
+                self.saida.put(resultado)
+
+
+class Pipeline:
+    """
+    Agrupa filas e estágios, para iniciar/encerrar tudo junto e consultar a profundidade das filas.
+    """
+
+    def __init__(self):
+        self.filas: list[FilaUltimo] = []
+        self.estagios: list[Estagio] = []
+
+    def fila(self, nome: str, capacidade: int = 1) -> FilaUltimo:
+        fila = FilaUltimo(nome, capacidade)
+        self.filas.append(fila)
+        return fila
+
+    def estagio(self, nome: str, entrada: FilaUltimo, funcao, saida: FilaUltimo = None) -> Estagio:
+        estagio = Estagio(nome, entrada, funcao, saida)
+        self.estagios.append(estagio)
+        return estagio
+
+    def iniciar(self) -> None:
+        for estagio in self.estagios:
+            estagio.start()
+
+    def encerrar(self) -> None:
+        for fila in self.filas:
+            fila.fechar()
+
+    def status(self) -> dict:
+        """
+        Profundidade, descartes e recebidos de cada fila.
+        """
+        return {
+            f.nome: {
+                "profundidade": f.profundidade(),
+                "recebidos": f.recebidos,
+                "descartados": f.descartados,
+            }
+            for f in self.filas
+        }
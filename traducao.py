@@ -0,0 +1,288 @@
+import re
+import threading
+import time
+
+from metricas import METRICAS
+
+# fim de frase: . ! ? … (com aspas/parênteses opcionais depois)
+_FIM_FRASE = re.compile(r"[.!?…][\"')\]]*$")
+# quebra de frase dentro da mesma linha: "Hi. How are you?" -> ["Hi.", "How are you?"]
+_QUEBRA_FRASE = re.compile(r"(?<=[.!?…])\s+(?=[-–—\"'(\[A-Z0-9])")
+# abreviações que terminam em ponto sem terminar a frase ("Mr. Smith is here.")
+# (sem palavras que também fecham frase sozinhas, como "No.")
+ABREVIACOES = frozenset("mr mrs ms mx dr prof sr jr st mt ft lt sgt capt gov rev hon vs etc vol dept approx".split())
+_TRAVESSOES = ("-", "–", "—")
+
+
+def dividir_unidades(texto: str) -> list[tuple[str, str]]:
+    """
+    Divide a legenda em unidades de tradução (frases), usando as quebras de linha do OCR.
+    Uma linha sem pontuação final continua na próxima; fala nova (travessão) sempre abre unidade.
+    Retorna [(unidade, separador)], onde separador é o que vinha depois dela no original
+    ("\n" ou " "), para remontar a tradução com o mesmo layout.
+    """
+    linhas = [l.strip() for l in (texto or "").split("\n") if l.strip()]
+
+    unidades = []
+    atual = ""
+    for linha in linhas:
+        if atual and linha.startswith(_TRAVESSOES):
+            unidades.append((atual, "\n"))
+            atual = ""
+
+        atual = f"{atual} {linha}".strip()
+
+        if _FIM_FRASE.search(atual) and not _termina_em_abreviacao(atual):
+            frases = _dividir_frases(atual)
+            unidades.extend((f, " ") for f in frases[:-1])
+            unidades.append((frases[-1], "\n"))
+            atual = ""
+
+    if atual:
+        frases = _dividir_frases(atual)
+        unidades.extend((f, " ") for f in frases[:-1])
+        unidades.append((frases[-1], "\n"))
+
+    return unidades
+
+
+def _termina_em_abreviacao(texto: str) -> bool:
+    """
+    True se o texto termina numa abreviação ("Mr.", "Dr.") ou inicial ("J."), que não fecham a frase.
+    """
+    ultima = texto.rsplit(None, 1)[-1] if texto.strip() else ""
+    if not ultima.endswith("."):
+        return False
+    palavra = ultima.rstrip(".").lstrip("\"'([-–—").casefold()
+    return palavra in ABREVIACOES or (len(palavra) == 1 and palavra.isalpha())
+
+
+def _dividir_frases(texto: str) -> list[str]:
+    """
+    _QUEBRA_FRASE, mas sem quebrar depois de abreviações: os pedaços são juntados de volta.
+    """
+    frases = []
+    for pedaco in _QUEBRA_FRASE.split(texto):
+        if frases and _termina_em_abreviacao(frases[-1]):
+            frases[-1] = f"{frases[-1]} {pedaco}"
+        else:
+            frases.append(pedaco)
+    return frases
+
+
+def montar_traducao(partes: list[tuple[str, str]]) -> str:
+    """
+    Remonta [(tradução da unidade, separador)] numa única string.
+    """
+    return "".join(t + sep for t, sep in partes).strip()
+
+
+class ServicoTraducao:
+    """
+    Tradução de uma legenda por unidades (linhas/frases), cada uma com seu cache:
+    se só a linha de baixo mudou, só ela vai para a rede. As unidades que faltam
+    vão num único lote (translate_batch do backend).
+    """
+
+    def __init__(self, tradutor, cache):
+        self.tradutor = tradutor              # backend (tradutores.Tradutor)
+        self.cache = cache                    # cache_traducao.CacheTraducao
+
+        self.requisicoes = 0     # chamadas ao backend (lotes)
+        self.unidades_rede = 0   # unidades que foram para o backend
+
+    def traduzir(self, texto: str) -> str:
+        """
+        Retorna a tradução completa, ou "" se alguma unidade falhou (não mostra tradução parcial).
+        """
+        unidades = dividir_unidades(texto)
+
+        traducoes = {}
+        faltando = []
+        for unidade, _ in unidades:
+            if unidade in traducoes or unidade in faltando:
+                continue
+
+            em_cache = self._em_cache(unidade)
+            if em_cache is None:
+                faltando.append(unidade)
+            elif not em_cache:
+                return ""  # falhou há pouco
+            else:
+                traducoes[unidade] = em_cache
+
+        if faltando:
+            self.requisicoes += 1
+            self.unidades_rede += len(faltando)
+            try:
+                with METRICAS.medir("traducao_rede"):
+                    resultados = self.tradutor.translate_batch(faltando)
+            except Exception as e:
+                print("Erro na tradução:", e)
+                for unidade in faltando:
+                    self.cache.marcar_falha(unidade)
+                return ""
+
+            for unidade, traducao in zip(faltando, resultados):
+                if not traducao:
+                    self.cache.marcar_falha(unidade)
+                    return ""
+                self.cache.put(unidade, traducao)
+                traducoes[unidade] = traducao
+
+        return montar_traducao([(traducoes[u], sep) for u, sep in unidades])
+
+    def traduzir_lote(self, textos: list[str]) -> list[str]:
+        """
+        Traduz várias legendas de uma vez (ex.: um vídeo inteiro): as unidades que faltam em todas
+        elas vão juntas para o backend, que divide em requisições pelo tamanho.
+        Retorna as traduções na mesma ordem ("" para as que falharam).
+        """
+        faltando = []
+        vistas = set()
+        for texto in textos:
+            for unidade, _ in dividir_unidades(texto):
+                if unidade in vistas:
+                    continue
+                vistas.add(unidade)
+                if self._em_cache(unidade) is None:
+                    faltando.append(unidade)
+
+        if faltando:
+            self.requisicoes += 1
+            self.unidades_rede += len(faltando)
+            try:
+                with METRICAS.medir("traducao_rede"):
+                    resultados = self.tradutor.translate_batch(faltando)
+            except Exception as e:
+                # as legendas ainda passam por traduzir() abaixo, uma a uma
+                print("Erro na tradução em lote:", e)
+                resultados = []
+
+            for unidade, traducao in zip(faltando, resultados):
+                if traducao:
+                    self.cache.put(unidade, traducao)
+
+        return [self.traduzir(texto) for texto in textos]
+
+    def _em_cache(self, texto: str):
+        """
+        Tenta resolver uma unidade sem rede: cache exato e depois cache aproximado.
+        Retorna a tradução, "" se a unidade falhou há pouco (TTL negativo) ou None se precisa ir à API.
+        """
+        em_cache = self.cache.get(texto)
+        if em_cache is not None:
+            return em_cache
+
+        # quase igual a uma linha já traduzida (ruído de OCR): reaproveita sem ir à rede
+        aproximado = self.cache.get_aproximado(texto)
+        if aproximado is not None:
+            return aproximado[1]
+
+        # falhou há pouco: não repete a chamada de rede até o TTL negativo expirar
+        if self.cache.falhou_recentemente(texto):
+            return ""
+
+        return None
+
+
+class TradutorAssincrono:
+    """
+    Worker de tradução em thread própria, com debounce.
+
+    - pedir() nunca bloqueia (pode ser chamado do loop de OCR ou do main thread do Tk).
+    - Pedidos que chegam dentro da janela de debounce substituem o anterior: só a legenda
+      mais nova é enviada para a API.
+    - Se chegar um pedido novo enquanto a chamada de rede está em andamento, a resposta
+      atrasada é descartada (ao_traduzir não é chamado para ela).
+    """
+
+    def __init__(self, traduzir, ao_traduzir, debounce: float = 0.15):
+        self.traduzir = traduzir          # texto -> tradução ("" em caso de erro)
+        self.ao_traduzir = ao_traduzir    # (texto, tradução) -> None, chamado na thread do worker
+        self.debounce = debounce
+
+        self._cond = threading.Condition()
+        self._pendente = None
+        self._geracao = 0
+        self._encerrado = False
+
+        self.descartados = 0  # pedidos substituídos antes do envio
+        self.atrasados = 0    # respostas que chegaram depois de um pedido mais novo
+
+        self._thread = threading.Thread(target=self._run, name="traducao", daemon=True)
+
+    def iniciar(self) -> None:
+        self._thread.start()
+
+    def pedir(self, texto: str) -> None:
+        with self._cond:
+            if self._pendente is not None:
+                self.descartados += 1
+
+            self._geracao += 1
+            self._pendente = (self._geracao, texto, time.monotonic())
+            self._cond.notify()
+
+    def cancelar(self) -> None:
+        """
+        Descarta o pedido pendente e invalida qualquer resposta em andamento.
+        """
+        with self._cond:
+            self._geracao += 1
+            self._pendente = None
+
+    def encerrar(self) -> None:
+        with self._cond:
+            self._encerrado = True
+            self._pendente = None
+            self._cond.notify_all()
+
+    def pendentes(self) -> int:
+        with self._cond:
+            return 0 if self._pendente is None else 1
+
+    def _proximo_pedido(self):
+        """
+        Espera um pedido e o período de debounce sem pedidos mais novos.
+        """
+        with self._cond:
+            while not self._encerrado:
+                if self._pendente is None:
+                    self._cond.wait()
+                    continue
+
+                geracao, texto, chegada = self._pendente
+                restante = chegada + self.debounce - time.monotonic()
+                if restante > 0:
+                    # acorda antes se chegar pedido novo (que reinicia o debounce)
+                    self._cond.wait(restante)
+                    continue
+
+                self._pendente = None
+                return geracao, texto
+
+            return None
+
+    def _run(self) -> None:
+        while True:
+            pedido = self._proximo_pedido()
+            if pedido is None:
+                return
+
+            geracao, texto = pedido
+
+            try:
+                traducao = self.traduzir(texto)
+            except Exception as e:
+                print("Erro na tradução:", e)
+                continue
+
+            with self._cond:
+                if geracao != self._geracao:
+                    # já existe legenda mais nova: resposta velha não vai para a tela
+                    self.atrasados += 1
+                    continue
+
+            if traducao:
+                self.ao_traduzir(texto, traducao)
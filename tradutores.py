@@ -0,0 +1,157 @@
+import html
+import re
+import time
+from abc import ABC, abstractmethod
+
+import requests
+
+
+class Tradutor(ABC):
+    """
+    Interface dos backends de tradução (mesmos nomes de método do deep_translator).
+    translate_batch deve mandar a lista inteira no menor número possível de requisições.
+    """
+
+    origem = "en"
+    destino = "pt"
+
+    @abstractmethod
+    def translate(self, texto: str) -> str:
+        ...
+
+    def translate_batch(self, textos: list[str]) -> list[str]:
+        return [self.translate(t) for t in textos]
+
+    def fechar(self) -> None:
+        pass
+
+
+class TradutorGoogle(Tradutor):
+    """
+    Google Translate (endpoint web usado pelo deep_translator), com:
+    - requests.Session: conexões keep-alive reaproveitadas entre chamadas (sem handshake TLS por linha);
+    - translate_batch: junta as linhas numa única requisição separadas por quebra de linha e
+      separa a resposta; se a contagem de linhas não bater, cai para uma requisição por linha.
+    Se a resposta vier num formato inesperado, usa o GoogleTranslator do deep_translator.
+    """
+
+    URL = "https://translate.google.com/m"
+    _RESULTADO = re.compile(r'<div[^>]*class="result-container"[^>]*>(.*?)</div>', re.S)
+
+    def __init__(self, origem: str = "en", destino: str = "pt", timeout: float = 5.0,
+                 max_chars_lote: int = 4500, conexoes: int = 4):
+        self.origem = origem
+        self.destino = destino
+        self.timeout = timeout
+        self.max_chars_lote = max_chars_lote
+
+        self._sessao = requests.Session()
+        adaptador = requests.adapters.HTTPAdapter(pool_connections=conexoes, pool_maxsize=conexoes)
+        self._sessao.mount("https://", adaptador)
+        self._sessao.headers["User-Agent"] = "Mozilla/5.0"
+
+        self._fallback = None
+
+    def _requisitar(self, texto: str) -> str:
+        r = self._sessao.get(
+            self.URL,
+            params={"sl": self.origem, "tl": self.destino, "q": texto},
+            timeout=self.timeout
+        )
+        r.raise_for_status()
+
+        m = self._RESULTADO.search(r.text)
+        if not m:
+            return self._via_deep_translator(texto)
+
+        return html.unescape(m.group(1)).strip()
+
+    def _via_deep_translator(self, texto: str) -> str:
+        if self._fallback is None:
+            from deep_translator import GoogleTranslator
+            self._fallback = GoogleTranslator(source=self.origem, target=self.destino)
+        return self._fallback.translate(texto)
+
+    def translate(self, texto: str) -> str:
+        return self._requisitar(texto)
+
+    def translate_batch(self, textos: list[str]) -> list[str]:
+        resultados = []
+        for lote in self._lotes(textos):
+            if len(lote) == 1:
+                resultados.append(self._requisitar(lote[0]))
+                continue
+
+            traduzido = self._requisitar("\n".join(lote)).split("\n")
+            traduzido = [t.strip() for t in traduzido if t.strip()]
+
+            if len(traduzido) == len(lote):
+                resultados.extend(traduzido)
+            else:
+                # o serviço juntou/quebrou linhas: não dá para casar, traduz uma a uma
+                resultados.extend(self._requisitar(t) for t in lote)
+
+        return resultados
+
+    def _lotes(self, textos: list[str]):
+        lote, tamanho = [], 0
+        for t in textos:
+            t = " ".join(t.split())  # quebra de linha é o separador do lote
+            if lote and tamanho + len(t) + 1 > self.max_chars_lote:
+                yield lote
+                lote, tamanho = [], 0
+            lote.append(t)
+            tamanho += len(t) + 1
+        if lote:
+            yield lote
+
+    def fechar(self) -> None:
+        self._sessao.close()
+
+
+class TradutorLocal(Tradutor):
+    """
+    Backend local, sem rede: simula a latência de um serviço remoto (por requisição e por caractere)
+    e devolve uma "tradução" determinística. Serve para benchmarks e para rodar o pipeline offline.
+    Um dicionário de traduções conhecidas pode ser passado em `traducoes`.
+    """
+
+    def __init__(self, origem: str = "en", destino: str = "pt", latencia: float = 0.2,
+                 latencia_por_char: float = 0.0, traducoes: dict = None):
+        self.origem = origem
+        self.destino = destino
+        self.latencia = latencia
+        self.latencia_por_char = latencia_por_char
+        self.traducoes = traducoes or {}
+
+        self.requisicoes = 0
+
+    def _simular(self, textos: list[str]) -> None:
+        self.requisicoes += 1
+        espera = self.latencia + self.latencia_por_char * sum(len(t) for t in textos)
+        if espera > 0:
+            time.sleep(espera)
+
+    def _traduzir_local(self, texto: str) -> str:
+        return self.traducoes.get(texto) or f"[{self.destino}] {texto}"
+
+    def translate(self, texto: str) -> str:
+        self._simular([texto])
+        return self._traduzir_local(texto)
+
+    def translate_batch(self, textos: list[str]) -> list[str]:
+        # um lote = uma "requisição": a latência fixa é paga uma vez só
+        self._simular(textos)
+        return [self._traduzir_local(t) for t in textos]
+
+
+def criar_tradutor(backend: str = "google", origem: str = "en", destino: str = "pt", **kwargs) -> Tradutor:
+    """
+    Cria o backend de tradução pelo nome ("google" ou "local").
+    """
+    if backend == "google":
+        return TradutorGoogle(origem, destino, **kwargs)
+    if backend == "local":
+        return TradutorLocal(origem, destino, **kwargs)
+
+    raise ValueError(f"Backend de tradução desconhecido: {backend}")
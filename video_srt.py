@@ -0,0 +1,258 @@
+"""
+Modo offline: gera legendas .srt (EN e PT) a partir de um vídeo com legenda embutida (hardsub).
+
+Decodifica o vídeo com OpenCV e só faz OCR perto das trocas de legenda:
+- enquanto a área da legenda está parada, lê poucos frames por segundo (--fps) e os demais
+  são só decodificados (grab), sem conversão;
+- quando a área muda (por padrão só a máscara de texto; --sem-mascara compara a imagem toda),
+  passa a ler todos os frames até a imagem estabilizar e faz um único OCR do frame estável
+  (mesmo preprocessar_imagem/LeitorOcr do app);
+- leituras que diferem só por ruído de OCR (mesma_legenda) viram uma única legenda, com início e fim.
+A tradução é feita no final, em lote, com o mesmo cache de traduções do app.
+
+Uso:
+    python video_srt.py episodio.mkv --area 0,860,1920,220
+    -> episodio.en.srt e episodio.pt.srt
+    python video_srt.py episodio.mkv --sem-mascara   # legenda amarela/sem contorno
+"""
+import argparse
+import os
+import time
+from dataclasses import dataclass
+
+import cv2
+
+from cache_ocr import CacheOcr
+from cache_traducao import CacheTraducao, mesma_legenda
+from ocr import LeitorOcr
+from opencv import CONFIG, EscalaAutomatica, assinatura_imagem, imagem_mudou, ler_area, pegada_texto, preprocessar_imagem, recortar_area
+from traducao import ServicoTraducao
+from tradutores import criar_tradutor
+
+
+@dataclass
+class Legenda:
+    inicio: float
+    fim: float
+    texto: str
+    traducao: str = ""
+
+
+class ExtratorLegendas:
+    """
+    Percorre o vídeo uma vez e devolve as legendas (EN) com seus tempos.
+    """
+
+    def __init__(self, leitor: LeitorOcr = None, area=None, fps: float = 4.0,
+                 duracao_min: float = 0.3, max_instavel: float = 1.0,
+                 usar_mascara: bool = True, limiar_mudanca: float = 0.25):
+        self.leitor = leitor or LeitorOcr(cache=CacheOcr())
+        self.area = area
+        self.fps = fps                    # amostragem com a legenda parada
+        self.duracao_min = duracao_min    # legendas mais curtas são ruído (transição/fade)
+        self.max_instavel = max_instavel  # OCR mesmo sem estabilizar depois desse tempo (s)
+        self.usar_mascara = usar_mascara  # compara só os pixels de texto (ignora o vídeo ao fundo)
+        # % dos pixels da assinatura que precisam mudar (imagem_mudou). Próprio do modo vídeo, mais
+        # sensível que o diff_threshold do app: aqui perder uma troca curta ("Yes." -> "No.")
+        # junta duas legendas, e um OCR a mais custa pouco.
+        self.limiar_mudanca = limiar_mudanca
+
+        self.cfg = CONFIG.get()
+        self.escala_auto = EscalaAutomatica()
+
+        self.duracao = 0.0  # do vídeo processado (s)
+        self.frames_decodificados = 0
+        self.frames_lidos = 0
+        self.leituras = 0
+
+    def _ler(self, frame) -> str:
+        # com a máscara, sem pixels de texto na área = legenda sumiu, não precisa de OCR.
+        # Sem a máscara a pegada pode faltar com a legenda na tela (amarela, sem contorno).
+        pegada = pegada_texto(frame)
+        if pegada is None and self.usar_mascara:
+            return ""
+
+        self.leituras += 1
+        escala = self.escala_auto.obter(frame, self.cfg) if int(self.cfg.resize_auto) == 1 else None
+        img_proc = preprocessar_imagem(frame, self.cfg, escala)
+        texto = self.leitor.extrair_texto(img_proc, self.cfg, pegada=pegada)
+        if texto and escala is not None:
+            self.escala_auto.confirmar()
+        return texto.replace("|", "I") if texto else ""
+
+    def processar(self, caminho: str, progresso: float = 60.0) -> list[Legenda]:
+        cap = cv2.VideoCapture(caminho)
+        if not cap.isOpened():
+            raise IOError(f"Não foi possível abrir o vídeo: {caminho}")
+
+        fps_video = cap.get(cv2.CAP_PROP_FPS) or 25.0
+        passo = max(1, int(round(fps_video / self.fps)))
+
+        legendas = []
+        atual = None
+
+        assinatura_anterior = None
+        t_anterior = 0.0
+        t_mudanca = None  # != None: área mudou e ainda não estabilizou
+        proximo_aviso = progresso
+
+        def fechar_atual(t_fim):
+            nonlocal atual
+            if atual is not None:
+                atual.fim = t_fim
+                if atual.fim - atual.inicio >= self.duracao_min:
+                    legendas.append(atual)
+                atual = None
+
+        i = -1
+        try:
+            while cap.grab():
+                i += 1
+                self.frames_decodificados += 1
+                t = i / fps_video
+
+                # fora das trocas de legenda, só um frame a cada `passo` é convertido e comparado
+                if t_mudanca is None and i % passo:
+                    continue
+
+                ok, frame = cap.retrieve()
+                if not ok:
+                    continue
+
+                self.frames_lidos += 1
+                frame = recortar_area(frame, self.area)
+
+                if progresso and t >= proximo_aviso:
+                    print(f"{t / 60:.1f} min processados, {len(legendas)} legendas")
+                    proximo_aviso += progresso
+
+                # com a máscara de texto, movimento do vídeo atrás da legenda quase não conta como mudança
+                assinatura = assinatura_imagem(frame, usar_mascara_texto=self.usar_mascara)
+                mudou = assinatura_anterior is None or imagem_mudou(assinatura, assinatura_anterior, self.limiar_mudanca)
+                t_amostra_anterior = t_anterior
+                assinatura_anterior, t_anterior = assinatura, t
+
+                if mudou and t_mudanca is None:
+                    # a troca aconteceu entre a amostra anterior e esta: o ponto médio erra no máximo meio passo
+                    t_mudanca = (t_amostra_anterior + t) / 2 if i else 0.0
+
+                if t_mudanca is None:
+                    continue
+
+                if mudou and t - t_mudanca < self.max_instavel:
+                    continue  # ainda em transição: espera o próximo frame
+
+                texto = self._ler(frame)
+
+                if not (atual is not None and texto and mesma_legenda(texto, atual.texto)):
+                    fechar_atual(t_mudanca)
+                    if texto:
+                        atual = Legenda(t_mudanca, t_mudanca, texto)
+
+                t_mudanca = None
+        finally:
+            cap.release()
+
+        self.duracao = (i + 1) / fps_video
+        fechar_atual(self.duracao)
+
+        if self.usar_mascara and self.frames_lidos and not self.leituras:
+            print("Aviso: a máscara de texto não encontrou pixels de legenda em nenhum frame. "
+                  "Se o vídeo tem legenda (ex.: amarela ou sem contorno), rode de novo com --sem-mascara.")
+        return juntar_repetidas(legendas)
+
+
+def juntar_repetidas(legendas: list[Legenda], intervalo_max: float = 0.25) -> list[Legenda]:
+    """
+    Junta legendas seguidas com o mesmo texto separadas por um intervalo curto
+    (piscada da máscara numa transição de cena, por exemplo).
+    """
+    resultado = []
+    for legenda in legendas:
+        anterior = resultado[-1] if resultado else None
+        if (anterior is not None and legenda.inicio - anterior.fim <= intervalo_max
+                and mesma_legenda(legenda.texto, anterior.texto)):
+            anterior.fim = legenda.fim
+            continue
+        resultado.append(legenda)
+    return resultado
+
+
+def tempo_srt(segundos: float) -> str:
+    ms = int(round(max(0.0, segundos) * 1000))
+    h, ms = divmod(ms, 3_600_000)
+    m, ms = divmod(ms, 60_000)
+    s, ms = divmod(ms, 1000)
+    return f"{h:02d}:{m:02d}:{s:02d},{ms:03d}"
+
+
+def escrever_srt(caminho: str, legendas: list[Legenda], traduzido: bool = False) -> int:
+    """
+    Grava o .srt (texto original ou tradução). Retorna o número de entradas gravadas.
+    """
+    n = 0
+    with open(caminho, "w", encoding="utf-8") as f:
+        for legenda in legendas:
+            texto = legenda.traducao if traduzido else legenda.texto
+            if not texto:
+                continue
+            n += 1
+            f.write(f"{n}\n{tempo_srt(legenda.inicio)} --> {tempo_srt(legenda.fim)}\n{texto}\n\n")
+    return n
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera legendas .srt (EN e PT) de um vídeo com legenda embutida.")
+    parser.add_argument("video")
+    parser.add_argument("--area", type=ler_area, default=None, help="região da legenda no frame: x,y,largura,altura")
+    parser.add_argument("--fps", type=float, default=4.0, help="amostragem com a legenda parada (frames/s)")
+    parser.add_argument("--sem-mascara", action="store_true",
+                        help="detecta mudança na imagem inteira, não só nos pixels de texto (legenda amarela/sem contorno)")
+    parser.add_argument("--limiar", type=float, default=0.25,
+                        help="%% dos pixels da miniatura que precisam mudar para contar como troca de legenda")
+    parser.add_argument("--saida", default=None, help="prefixo dos arquivos (padrão: nome do vídeo)")
+    parser.add_argument("--backend", default="google", help='backend de tradução: "google" ou "local"')
+    parser.add_argument("--origem", default="en")
+    parser.add_argument("--destino", default="pt")
+    parser.add_argument("--cache", default="traducoes.db", help="cache de traduções (SQLite), o mesmo do app")
+    parser.add_argument("--sem-traducao", action="store_true", help="grava só o .srt original")
+    args = parser.parse_args()
+
+    prefixo = args.saida or os.path.splitext(args.video)[0]
+
+    extrator = ExtratorLegendas(area=args.area, fps=args.fps,
+                                usar_mascara=not args.sem_mascara, limiar_mudanca=args.limiar)
+
+    inicio = time.perf_counter()
+    legendas = extrator.processar(args.video)
+    duracao_ocr = time.perf_counter() - inicio
+
+    print(f"{len(legendas)} legendas, {extrator.leituras} OCRs, "
+          f"{extrator.frames_lidos}/{extrator.frames_decodificados} frames lidos, {duracao_ocr:.1f} s")
+
+    n = escrever_srt(f"{prefixo}.{args.origem}.srt", legendas)
+    print(f"{n} entradas em {prefixo}.{args.origem}.srt")
+
+    if not args.sem_traducao and legendas:
+        cache = CacheTraducao(args.cache, origem=args.origem, destino=args.destino)
+        tradutor = criar_tradutor(args.backend, origem=args.origem, destino=args.destino)
+        servico = ServicoTraducao(tradutor, cache)
+        try:
+            traducoes = servico.traduzir_lote([l.texto for l in legendas])
+        finally:
+            tradutor.fechar()
+            cache.fechar()
+
+        for legenda, traducao in zip(legendas, traducoes):
+            legenda.traducao = traducao
+
+        n = escrever_srt(f"{prefixo}.{args.destino}.srt", legendas, traduzido=True)
+        print(f"{n} entradas em {prefixo}.{args.destino}.srt")
+
+    total = time.perf_counter() - inicio
+    if extrator.duracao and total > 0:
+        print(f"Tempo total {total:.1f} s para {extrator.duracao / 60:.1f} min de vídeo (~{extrator.duracao / total:.0f}x o tempo real)")
+
+
+if __name__ == "__main__":
+    main()